@@ -1,6 +1,6 @@
 from agents import Agent
 from agents.extensions.handoff_prompt import prompt_with_handoff_instructions
-from tools import fetch_weather
+from tools import fetch_weather, fetch_weather_bulk
 
 spanish_agent = Agent(
     name="SpanishAgent",
@@ -9,6 +9,8 @@ spanish_agent = Agent(
         "You are a polite assistant who always replies in Spanish."
     ),
     model="gpt-4o",
+    # Confident Spanish turns are routed here directly, so weather questions must be answerable here too.
+    tools=[fetch_weather, fetch_weather_bulk],
 )
 
 agent = Agent(
@@ -18,6 +20,21 @@ agent = Agent(
     ),
     model="gpt-4o",
     handoffs=[spanish_agent],
-    tools=[fetch_weather],
+    tools=[fetch_weather, fetch_weather_bulk],
 )
 
+
+urdu_agent = Agent(
+    name="UrduAgent",
+    handoff_description="Handles Urdu conversations.",
+    instructions="You are a polite assistant who always replies in Urdu. Be helpful and conversational.",
+    model="gpt-4o",
+    tools=[fetch_weather, fetch_weather_bulk],
+)
+
+# Agent to dispatch to directly when the local language check is confident
+language_agents = {
+    "en": agent,
+    "es": spanish_agent,
+    "ur": urdu_agent,
+}
@@ -0,0 +1,219 @@
+"""
+Streaming microphone capture with energy-based endpointing
+"""
+
+import asyncio
+import math
+import time
+
+import numpy as np
+
+from config import AUDIO_CONFIG
+
+
+def frame_energy_db(block):
+    """Return the RMS energy of an int16 block in dBFS"""
+    if block.size == 0:
+        return -120.0
+    samples = block.astype(np.float32)
+    rms = math.sqrt(float(np.dot(samples, samples)) / samples.size)
+    if rms <= 0:
+        return -120.0
+    return 20.0 * math.log10(rms / 32768.0)
+
+
+class EnergyEndpointer:
+    """Decide when a spoken turn is over from the energy of successive blocks.
+
+    Feed blocks in order through `process()`; it returns True once the turn
+    should be closed (trailing silence after speech, no speech at all within
+    the timeout, or the maximum turn length reached). A timeout or maximum
+    length of None or infinity never closes the turn.
+    """
+
+    def __init__(
+        self,
+        sample_rate=AUDIO_CONFIG["sample_rate"],
+        threshold_db=AUDIO_CONFIG["speech_threshold_db"],
+        noise_margin_db=AUDIO_CONFIG["noise_margin_db"],
+        silence_ms=AUDIO_CONFIG["endpoint_silence_ms"],
+        min_speech_ms=AUDIO_CONFIG["min_speech_ms"],
+        no_speech_timeout=AUDIO_CONFIG["no_speech_timeout"],
+        max_turn_duration=AUDIO_CONFIG["max_turn_duration"],
+    ):
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.silence_samples = int(sample_rate * silence_ms / 1000)
+        self.min_speech_samples = int(sample_rate * min_speech_ms / 1000)
+        self.no_speech_samples = self._limit_samples(no_speech_timeout)
+        self.max_samples = self._limit_samples(max_turn_duration)
+        self.reset()
+
+    def _limit_samples(self, seconds):
+        """Sample count for a time limit; None or infinity means no limit"""
+        if seconds is None or math.isinf(seconds):
+            return math.inf
+        return int(self.sample_rate * seconds)
+
+    def reset(self):
+        """Forget everything seen so far and start a new turn"""
+        self.noise_floor_db = None
+        self.total_samples = 0
+        self.speech_samples = 0
+        self.silence_run = 0
+        self.speech_started = False
+        self.reason = None
+
+    def is_speech(self, energy_db):
+        """Classify one block's energy against the threshold and noise floor"""
+        floor = self.noise_floor_db if self.noise_floor_db is not None else -120.0
+        return energy_db >= max(self.threshold_db, floor + self.noise_margin_db)
+
+    def process(self, block):
+        """Consume one block; return True when the turn should end"""
+        n = len(block)
+        energy_db = frame_energy_db(block)
+        self.total_samples += n
+
+        if self.is_speech(energy_db):
+            self.speech_samples += n
+            self.silence_run = 0
+            if self.speech_samples >= self.min_speech_samples:
+                self.speech_started = True
+        else:
+            self.silence_run += n
+            if not self.speech_started:
+                # Short blips before real speech don't count towards onset.
+                self.speech_samples = 0
+            # Track the background level only while nobody is talking.
+            if self.noise_floor_db is None:
+                self.noise_floor_db = energy_db
+            else:
+                self.noise_floor_db = 0.95 * self.noise_floor_db + 0.05 * energy_db
+
+        if self.speech_started and self.silence_run >= self.silence_samples:
+            self.reason = "silence"
+        elif not self.speech_started and self.total_samples >= self.no_speech_samples:
+            self.reason = "no_speech"
+        elif self.total_samples >= self.max_samples:
+            self.reason = "max_duration"
+        return self.reason is not None
+
+
+class MicrophoneSource:
+    """Live microphone blocks, read one at a time with `await read()`.
+
+    The PortAudio callback copies each block onto an asyncio queue, so the
+    stream keeps recording while the reader is busy elsewhere.
+    """
+
+    def __init__(self, sample_rate=AUDIO_CONFIG["sample_rate"], block_ms=AUDIO_CONFIG["block_ms"]):
+        self.sample_rate = sample_rate
+        self.block_size = int(sample_rate * block_ms / 1000)
+        self._blocks = None
+        self._stream = None
+
+    def start(self):
+        """Open the input stream; must be called from the event loop thread"""
+        import sounddevice as sd
+
+        loop = asyncio.get_running_loop()
+        self._blocks = asyncio.Queue()
+
+        def callback(indata, frames, time_info, status):
+            # Runs on the PortAudio thread: copy out and hand over to the loop.
+            loop.call_soon_threadsafe(self._blocks.put_nowait, indata[:, 0].copy())
+
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=AUDIO_CONFIG["channels"],
+            dtype=np.int16,
+            blocksize=self.block_size,
+            callback=callback,
+        )
+        self._stream.start()
+        return self
+
+    async def read(self):
+        return await self._blocks.get()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+
+class ArraySource:
+    """Stand-in for the microphone that plays back an int16 array in real time.
+
+    Blocks come out at the rate a microphone would deliver them; once the
+    array is used up it keeps delivering silence, like a quiet room. Use it to
+    drive endpointing and barge-in with synthetic audio.
+    """
+
+    def __init__(self, samples, sample_rate=AUDIO_CONFIG["sample_rate"], block_ms=AUDIO_CONFIG["block_ms"],
+                 realtime=True):
+        self.samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        self.sample_rate = sample_rate
+        self.block_size = int(sample_rate * block_ms / 1000)
+        self.realtime = realtime
+        self.position = 0
+        self._started = None
+
+    def start(self):
+        self._started = time.monotonic()
+        return self
+
+    async def read(self):
+        if self._started is None:
+            self.start()
+        if self.realtime:
+            due = self._started + (self.position + self.block_size) / self.sample_rate
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+        else:
+            await asyncio.sleep(0)
+        block = self.samples[self.position:self.position + self.block_size]
+        if len(block) < self.block_size:
+            block = np.concatenate([block, np.zeros(self.block_size - len(block), dtype=np.int16)])
+        self.position += self.block_size
+        return block
+
+    def close(self):
+        pass
+
+
+async def stream_microphone(
+    audio_input,
+    endpointer=None,
+    sample_rate=AUDIO_CONFIG["sample_rate"],
+    block_ms=AUDIO_CONFIG["block_ms"],
+    source=None,
+    preroll=(),
+):
+    """Push microphone blocks into a StreamedAudioInput until the endpointer closes the turn.
+
+    `source` replaces the default microphone (and is left open for the
+    caller); `preroll` blocks, e.g. the start of a barge-in, are sent first.
+    Returns the reason the turn ended ("silence", "no_speech" or "max_duration").
+    """
+    endpointer = endpointer or EnergyEndpointer(sample_rate=sample_rate)
+    own_source = source is None
+    if own_source:
+        source = MicrophoneSource(sample_rate, block_ms).start()
+    try:
+        for block in preroll:
+            await audio_input.add_audio(block)
+            endpointer.process(block)
+        while True:
+            block = await source.read()
+            await audio_input.add_audio(block)
+            if endpointer.process(block):
+                break
+    finally:
+        if own_source:
+            source.close()
+        # Signal the end of the stream so the transcription session can finish.
+        await audio_input.add_audio(None)
+    return endpointer.reason
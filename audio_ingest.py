@@ -0,0 +1,138 @@
+"""
+Zero-copy WAV ingest: header parsing, downmix and polyphase resampling to the pipeline rate
+"""
+
+import mmap
+import struct
+from math import gcd
+
+import numpy as np
+
+from config import AUDIO_CONFIG
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def parse_wav_header(data):
+    """Locate the sample data in a RIFF/WAVE buffer without copying it.
+
+    Returns a dict with format, channels, sample_rate, sample_width,
+    data_offset and data_length (in bytes).
+    """
+    view = memoryview(data)
+    if len(view) < 12 or bytes(view[0:4]) != b"RIFF" or bytes(view[8:12]) != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+
+    header = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", view, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            fmt, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", view, body)
+            if fmt == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                # The real format tag is the first field of the sub-format GUID.
+                (fmt,) = struct.unpack_from("<H", view, body + 24)
+            header = {
+                "format": fmt,
+                "channels": channels,
+                "sample_rate": sample_rate,
+                "sample_width": bits // 8,
+            }
+        elif chunk_id == b"data":
+            if header is None:
+                raise ValueError("WAV data chunk appears before fmt chunk")
+            available = len(view) - body
+            # Streaming recorders may leave the size as 0 or 0xFFFFFFFF.
+            length = available if chunk_size in (0, 0xFFFFFFFF) else min(chunk_size, available)
+            frame_bytes = header["sample_width"] * header["channels"]
+            header["data_offset"] = body
+            header["data_length"] = length - length % frame_bytes
+            return header
+        offset = body + chunk_size + (chunk_size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+
+def wav_frames(data, header=None):
+    """Return the samples as a read-only (frames, channels) view onto `data`"""
+    header = header or parse_wav_header(data)
+    fmt, width = header["format"], header["sample_width"]
+    if fmt == WAVE_FORMAT_PCM and width == 2:
+        dtype = np.dtype("<i2")
+    elif fmt == WAVE_FORMAT_PCM and width == 4:
+        dtype = np.dtype("<i4")
+    elif fmt == WAVE_FORMAT_IEEE_FLOAT and width == 4:
+        dtype = np.dtype("<f4")
+    else:
+        raise ValueError(f"Unsupported WAV encoding (format {fmt}, {8 * width}-bit)")
+    samples = np.frombuffer(
+        data,
+        dtype=dtype,
+        count=header["data_length"] // width,
+        offset=header["data_offset"],
+    )
+    return samples.reshape(-1, header["channels"])
+
+
+def to_mono_int16(frames):
+    """Downmix a (frames, channels) array to mono int16, copying only when needed"""
+    if frames.dtype == np.int16:
+        if frames.shape[1] == 1:
+            return frames[:, 0]
+        # Average channel views in a wider type to avoid overflow.
+        mixed = frames[:, 0].astype(np.int32)
+        for ch in range(1, frames.shape[1]):
+            mixed += frames[:, ch]
+        return (mixed // frames.shape[1]).astype(np.int16)
+    if frames.dtype == np.int32:
+        mono = frames.mean(axis=1) if frames.shape[1] > 1 else frames[:, 0]
+        return (mono / 65536).astype(np.int16)
+    mono = frames.mean(axis=1) if frames.shape[1] > 1 else frames[:, 0]
+    return np.clip(mono * 32767, -32768, 32767).astype(np.int16)
+
+
+def resample_int16(samples, src_rate, dst_rate):
+    """Resample int16 audio with a polyphase filter, returning int16.
+
+    The filter runs in float32 and costs tens of times the CPU of the int16
+    downmix (see benchmarks.ingest), so matching rates return the input as is.
+    """
+    if src_rate == dst_rate:
+        return samples
+    from scipy.signal import resample_poly
+
+    g = gcd(src_rate, dst_rate)
+    resampled = resample_poly(samples.astype(np.float32), dst_rate // g, src_rate // g)
+    return np.clip(np.rint(resampled), -32768, 32767).astype(np.int16)
+
+
+def ingest_wav(data, target_rate=AUDIO_CONFIG["sample_rate"]):
+    """Decode WAV bytes into mono int16 samples at the pipeline rate.
+
+    Returns (samples, target_rate).
+    """
+    header = parse_wav_header(data)
+    mono = to_mono_int16(wav_frames(data, header))
+    return resample_int16(mono, header["sample_rate"], target_rate), target_rate
+
+
+def load_wav(path, target_rate=AUDIO_CONFIG["sample_rate"]):
+    """Read a WAV file through a memory map into mono int16 samples at the pipeline rate.
+
+    Only the pages the downmix and resampler touch are read; nothing is
+    buffered through Python bytes. Returns (samples, target_rate).
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        header = parse_wav_header(mapped)
+        frames = wav_frames(mapped, header)
+        # Copy out: views onto the map must be gone before it can be closed.
+        samples = np.array(resample_int16(to_mono_int16(frames), header["sample_rate"], target_rate))
+        del frames
+    finally:
+        mapped.close()
+    return samples, target_rate
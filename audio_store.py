@@ -0,0 +1,143 @@
+"""
+Per-session store of encoded reply audio with a byte budget
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import uuid
+import wave
+from collections import OrderedDict
+
+import numpy as np
+
+from config import AUDIO_STORE_CONFIG
+
+MIME_TYPES = {"wav": "audio/wav", "mp3": "audio/mpeg"}
+
+
+def to_int16(audio_data):
+    """Convert reply audio to int16, peak-normalizing float input"""
+    audio_data = np.asarray(audio_data)
+    if audio_data.dtype == np.int16:
+        return audio_data
+    max_val = np.max(np.abs(audio_data)) if audio_data.size else 0
+    if max_val > 0:
+        return np.int16(audio_data * 32767 / max_val)
+    return audio_data.astype(np.int16)
+
+
+def encode_audio(audio_data, sample_rate, fmt="wav"):
+    """Encode mono audio to WAV (or MP3 through pydub) bytes"""
+    pcm = to_int16(audio_data)
+    if fmt == "mp3":
+        from pydub import AudioSegment
+
+        segment = AudioSegment(pcm.tobytes(), frame_rate=sample_rate, sample_width=2, channels=1)
+        buffer = io.BytesIO()
+        segment.export(buffer, format="mp3")
+        return buffer.getvalue()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+class AudioStore:
+    """Encode each reply once and serve the bytes to every rerender.
+
+    Clips live in an LRU bounded by `max_bytes`. Evicted clips are dropped,
+    or written to `spill_dir` when spilling is enabled and read back from
+    there on demand.
+    """
+
+    def __init__(
+        self,
+        max_bytes=AUDIO_STORE_CONFIG["max_bytes"],
+        fmt=AUDIO_STORE_CONFIG["format"],
+        spill_to_disk=AUDIO_STORE_CONFIG["spill_to_disk"],
+        spill_dir=AUDIO_STORE_CONFIG["spill_dir"],
+    ):
+        self.max_bytes = max_bytes
+        self.format = fmt
+        self.spill_to_disk = spill_to_disk
+        self._spill_dir = spill_dir
+        self._clips = OrderedDict()
+        self._spilled = {}
+        self.bytes_held = 0
+        self.encodes = 0
+        self.encodes_avoided = 0
+        self.evictions = 0
+        self.spills = 0
+        self.disk_reads = 0
+
+    @property
+    def mime_type(self):
+        return MIME_TYPES[self.format]
+
+    def put(self, audio_data, sample_rate):
+        """Encode a reply once; returns the clip id to keep in chat history"""
+        encoded = encode_audio(audio_data, sample_rate, self.format)
+        self.encodes += 1
+        clip_id = uuid.uuid4().hex
+        self._clips[clip_id] = encoded
+        self.bytes_held += len(encoded)
+        self._enforce_budget()
+        return clip_id
+
+    def get(self, clip_id):
+        """Return the encoded bytes for a clip, or None if it was evicted"""
+        encoded = self._clips.get(clip_id)
+        if encoded is not None:
+            self._clips.move_to_end(clip_id)
+            self.encodes_avoided += 1
+            return encoded
+        path = self._spilled.get(clip_id)
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                self.disk_reads += 1
+                self.encodes_avoided += 1
+                return f.read()
+        return None
+
+    def clear(self):
+        self._clips.clear()
+        self._spilled.clear()
+        self.bytes_held = 0
+        if self._spill_dir is not None and os.path.isdir(self._spill_dir):
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def stats(self):
+        return {
+            "clips": len(self._clips),
+            "spilled_clips": len(self._spilled),
+            "bytes_held": self.bytes_held,
+            "encodes": self.encodes,
+            "encodes_avoided": self.encodes_avoided,
+            "evictions": self.evictions,
+            "spills": self.spills,
+        }
+
+    def _enforce_budget(self):
+        # Always keep the newest clip, even if it alone exceeds the budget.
+        while self.bytes_held > self.max_bytes and len(self._clips) > 1:
+            clip_id, encoded = self._clips.popitem(last=False)
+            self.bytes_held -= len(encoded)
+            self.evictions += 1
+            if self.spill_to_disk:
+                self._spill(clip_id, encoded)
+
+    def _spill(self, clip_id, encoded):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="voice-agent-audio-")
+        os.makedirs(self._spill_dir, exist_ok=True)
+        path = os.path.join(self._spill_dir, f"{clip_id}.{self.format}")
+        with open(path, "wb") as f:
+            f.write(encoded)
+        self._spilled[clip_id] = path
+        self.spills += 1
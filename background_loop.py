@@ -0,0 +1,52 @@
+"""
+Long-lived asyncio event loop running on a worker thread
+"""
+
+import asyncio
+import threading
+
+
+class BackgroundLoop:
+    """Own one event loop that runs forever on a daemon thread.
+
+    Coroutines are submitted from any thread with `submit()` and come back as
+    `concurrent.futures.Future` objects, so callers can poll, wait or cancel
+    without blocking the loop. Pooled clients opened on this loop stay warm
+    for as long as the process lives.
+    """
+
+    def __init__(self, name="voice-agent-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @property
+    def is_running(self):
+        return self._thread.is_alive() and self.loop.is_running()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop and return a concurrent future for it"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, timeout=5.0):
+        """Cancel outstanding tasks, stop the loop and join the thread"""
+        if not self._thread.is_alive():
+            return
+
+        async def _shutdown():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            self.submit(_shutdown()).result(timeout)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self.loop.close()
@@ -0,0 +1,102 @@
+"""
+Barge-in: stop the spoken reply as soon as the user starts talking over it
+"""
+
+import asyncio
+import time
+from collections import deque
+
+import metrics
+from audio_capture import EnergyEndpointer
+from config import AUDIO_CONFIG
+from workflow import cancel_result
+
+
+def onset_detector(sample_rate=AUDIO_CONFIG["sample_rate"]):
+    """An endpointer tuned to fire on sustained, louder-than-usual speech only.
+
+    Its noise floor tracks the speaker bleeding into the mic while the reply
+    plays, which keeps the reply itself from counting as the user talking.
+    """
+    return EnergyEndpointer(
+        sample_rate=sample_rate,
+        threshold_db=AUDIO_CONFIG["barge_in_threshold_db"],
+        min_speech_ms=AUDIO_CONFIG["barge_in_min_speech_ms"],
+        no_speech_timeout=float("inf"),
+        max_turn_duration=float("inf"),
+    )
+
+
+async def watch_for_onset(source, detector, preroll_ms=AUDIO_CONFIG["barge_in_preroll_ms"]):
+    """Read `source` until speech starts; return the blocks around the onset"""
+    detector.reset()
+    recent = deque()
+    recent_samples = 0
+    keep = int(detector.sample_rate * preroll_ms / 1000)
+    while True:
+        block = await source.read()
+        recent.append(block)
+        recent_samples += len(block)
+        while recent_samples - len(recent[0]) >= keep:
+            recent_samples -= len(recent.popleft())
+        detector.process(block)
+        if detector.speech_started:
+            return list(recent)
+
+
+async def play_interruptible(result, player, source, detector=None, listen_after=None, timer=None):
+    """Play a StreamedAudioResult, cutting it off if the user talks over it.
+
+    The mic `source` is watched for speech onset (once `listen_after`, e.g.
+    the capture task for this turn, has finished with it). On onset the
+    player buffer is flushed, the rest of `result.stream()` is abandoned and
+    the SDK's STT/LLM/TTS tasks are cancelled.
+
+    Returns None when the reply played out, else a dict with the onset
+    `blocks` (to start the next turn with) and `cancel_to_silence_ms`:
+    the time from detecting the onset until the speaker went quiet.
+    """
+    timer = timer or metrics.current()
+    detector = detector or onset_detector(player.sample_rate)
+
+    async def play():
+        async for event in result.stream():
+            if event.type == "voice_stream_event_audio":
+                timer.mark("first_audio")
+                await player.enqueue(event.data)
+        with timer.stage("playback_drain"):
+            await player.drain()
+
+    async def watch():
+        if listen_after is not None:
+            await asyncio.gather(listen_after, return_exceptions=True)
+        return await watch_for_onset(source, detector)
+
+    play_task = asyncio.create_task(play())
+    watch_task = asyncio.create_task(watch())
+    try:
+        await asyncio.wait({play_task, watch_task}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        play_task.cancel()
+        watch_task.cancel()
+        cancel_result(result)
+        raise
+
+    if not watch_task.done():
+        watch_task.cancel()
+        await asyncio.gather(watch_task, return_exceptions=True)
+        play_task.result()
+        return None
+
+    onset = time.perf_counter()
+    player.flush()
+    play_task.cancel()
+    cleanup = cancel_result(result)
+    await asyncio.gather(play_task, return_exceptions=True)
+    silent = await player.wait_flushed()
+    cancel_to_silence = silent - onset + player.output_latency
+    timer.add("cancel_to_silence", cancel_to_silence)
+    if cleanup is not None:
+        # Let the abandoned turn's STT/LLM/TTS tasks wind down before the next turn starts.
+        await asyncio.gather(cleanup, return_exceptions=True)
+    return {"blocks": watch_task.result(), "cancel_to_silence_ms": 1000 * cancel_to_silence}
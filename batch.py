@@ -0,0 +1,212 @@
+"""
+Offline batch runs: push a directory (or manifest) of recorded WAV turns through the agents.
+
+For each input `<id>` the output directory gets `<id>.json` (transcript,
+reply, agent, timings) and `<id>.wav` (the synthesized reply). The JSON is
+written last and atomically, so a rerun skips everything already finished
+and retries only what failed or was interrupted.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+
+import numpy as np
+from agents.voice import AudioInput
+
+from audio_ingest import load_wav
+from audio_store import encode_audio
+from config import AUDIO_CONFIG, BATCH_CONFIG
+from metrics import summarize
+from registry import get_pipeline
+from workflow import record_turn
+
+logger = logging.getLogger(__name__)
+
+
+def discover_inputs(source, default_agent):
+    """List (turn_id, wav_path, agent_name) from a directory tree or a manifest file.
+
+    A manifest has one entry per line: either a WAV path, or a JSON object
+    {"path": ..., "agent": ..., "id": ...}. Relative paths are resolved
+    against the manifest's directory. Two inputs with the same id (say
+    `sub/b.wav` and `sub__b.wav`) would share one result file, so they
+    raise ValueError.
+    """
+    if os.path.isdir(source):
+        inputs = []
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".wav"):
+                    path = os.path.join(root, name)
+                    inputs.append((_turn_id(os.path.relpath(path, source)), path, default_agent))
+        return _check_unique(inputs)
+
+    base = os.path.dirname(os.path.abspath(source))
+    inputs = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line) if line.startswith("{") else {"path": line}
+            path = os.path.join(base, entry["path"])
+            turn_id = entry.get("id") or _turn_id(entry["path"])
+            inputs.append((turn_id, path, entry.get("agent", default_agent)))
+    return _check_unique(inputs)
+
+
+def _turn_id(relative_path):
+    return os.path.splitext(relative_path)[0].replace(os.sep, "__").replace("/", "__")
+
+
+def _check_unique(inputs):
+    paths = {}
+    for turn_id, path, _ in inputs:
+        if turn_id in paths:
+            raise ValueError(
+                f"Inputs {paths[turn_id]} and {path} both map to id {turn_id!r}; "
+                "rename one or list them in a manifest with distinct \"id\" values"
+            )
+        paths[turn_id] = path
+    return inputs
+
+
+class RateLimiter:
+    """Space out starts so no more than `rate` happen per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.interval
+
+
+def _write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+async def run_one(turn_id, path, agent_name, out_dir, audio_format):
+    """Run one recorded turn and save its transcript, reply and audio"""
+    samples, sample_rate = load_wav(path, AUDIO_CONFIG["sample_rate"])
+    pipeline = get_pipeline(agent_name)
+    record = record_turn()
+    start = time.perf_counter()
+    first_audio = None
+    chunks = []
+    result = await pipeline.run(AudioInput(buffer=samples, frame_rate=sample_rate))
+    async for event in result.stream():
+        if event.type == "voice_stream_event_audio":
+            if first_audio is None:
+                first_audio = time.perf_counter()
+            chunks.append(event.data)
+        elif event.type == "voice_stream_event_error":
+            raise RuntimeError(str(event.error))
+    total = time.perf_counter() - start
+
+    audio_name = f"{turn_id}.{audio_format}"
+    reply_audio = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int16)
+    with open(os.path.join(out_dir, audio_name), "wb") as f:
+        f.write(encode_audio(reply_audio, AUDIO_CONFIG["output_sample_rate"], audio_format))
+
+    turn = {
+        "id": turn_id,
+        "input": path,
+        "agent": agent_name,
+        "answered_by": record.agent,
+        "transcript": record.transcript,
+        "reply": record.reply,
+        "reply_cached": record.cached,
+        "audio": audio_name,
+        "input_seconds": len(samples) / sample_rate,
+        "ttfa_ms": 1000 * (first_audio - start) if first_audio is not None else None,
+        "total_ms": 1000 * total,
+    }
+    _write_json(os.path.join(out_dir, f"{turn_id}.json"), turn)
+    return turn
+
+
+def _load_results(inputs, out_dir):
+    """The saved result of every input that has one"""
+    results = []
+    for turn_id, _, _ in inputs:
+        try:
+            with open(os.path.join(out_dir, f"{turn_id}.json"), encoding="utf-8") as f:
+                results.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return results
+
+
+async def run_batch(source, out_dir, agent_name="Weather Agent", concurrency=BATCH_CONFIG["concurrency"],
+                    rate_limit=BATCH_CONFIG["rate_limit"], audio_format=BATCH_CONFIG["audio_format"]):
+    """Run every pending input under a concurrency pool and start-rate limit; return a summary"""
+    os.makedirs(out_dir, exist_ok=True)
+    inputs = discover_inputs(source, agent_name)
+    pending = [item for item in inputs if not os.path.exists(os.path.join(out_dir, f"{item[0]}.json"))]
+    print(f"📂 {len(inputs)} inputs, {len(inputs) - len(pending)} already done, {len(pending)} to run")
+
+    slots = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate_limit)
+    completed = []
+    failed = {}
+
+    async def worker(turn_id, path, turn_agent):
+        async with slots:
+            await limiter.wait()
+            try:
+                turn = await run_one(turn_id, path, turn_agent, out_dir, audio_format)
+            except Exception as e:
+                logger.exception("Turn %s failed", turn_id)
+                failed[turn_id] = str(e)
+                return
+            completed.append(turn)
+            print(f"✅ [{len(completed) + len(failed)}/{len(pending)}] {turn_id}: {turn['total_ms']:.0f} ms")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(*item) for item in pending))
+    elapsed = time.perf_counter() - start
+
+    # Latencies cover every finished input, not just this run's, so a rerun doesn't lose earlier turns.
+    finished = _load_results(inputs, out_dir)
+    summary = {
+        "inputs": len(inputs),
+        "skipped": len(inputs) - len(pending),
+        "completed": len(completed),
+        "finished": len(finished),
+        "failed": failed,
+        "elapsed_s": elapsed,
+        "turns_per_minute": 60 * len(completed) / elapsed if elapsed > 0 else 0.0,
+        "ttfa_ms": summarize([t["ttfa_ms"] for t in finished if t.get("ttfa_ms") is not None]),
+        "total_ms": summarize([t["total_ms"] for t in finished]),
+        "concurrency": concurrency,
+        "rate_limit": rate_limit,
+    }
+    _write_json(os.path.join(out_dir, "summary.json"), summary)
+    return summary
+
+
+def print_summary(summary):
+    print(
+        f"\n📊 {summary['completed']} turns in {summary['elapsed_s']:.1f}s "
+        f"({summary['turns_per_minute']:.1f} turns/min), {len(summary['failed'])} failed, "
+        f"{summary['skipped']} skipped, {summary['finished']}/{summary['inputs']} inputs done"
+    )
+    for name in ("ttfa_ms", "total_ms"):
+        stats = summary[name]
+        if stats["count"]:
+            print(f"   {name:<9} p50 {stats['p50']:.0f}  p95 {stats['p95']:.0f}  p99 {stats['p99']:.0f}  max {stats['max']:.0f}")
@@ -0,0 +1,3 @@
+"""
+Offline benchmarks for the voice agent. Run modules with `python -m benchmarks.<name>`.
+"""
@@ -0,0 +1,128 @@
+"""
+Barge-in benchmark: how quickly a reply goes quiet when the user talks over it.
+
+A synthetic "mic" (audio_capture.ArraySource) says one utterance, waits for
+the reply to start playing on a simulated output device, then talks again.
+Everything runs on the fake models, so no audio hardware or network is used:
+
+    python -m benchmarks.barge_in --runs 10 --interrupt-after 0.8
+"""
+
+import argparse
+import asyncio
+import json
+
+import numpy as np
+from agents import set_tracing_disabled
+from agents.voice import StreamedAudioInput
+
+from agents_setup import agent
+from audio_capture import ArraySource, EnergyEndpointer, stream_microphone
+from barge_in import play_interruptible
+from benchmarks.fakes import (
+    FakeAudioPlayer,
+    FakeLLM,
+    FakeModelProvider,
+    FakeSTTModel,
+    FakeTTSModel,
+    FakeVoiceModelProvider,
+    TTS_SAMPLE_RATE,
+    fake_pipeline,
+    synthetic_utterance,
+)
+from config import AUDIO_CONFIG
+from metrics import summarize
+
+
+def conversation_audio(reply_starts_after, interrupt_after, sample_rate=TTS_SAMPLE_RATE):
+    """First utterance, silence until `interrupt_after` seconds into the reply, then a second utterance"""
+    first = synthetic_utterance(0, seconds=1.0, sample_rate=sample_rate)
+    gap = np.zeros(int(sample_rate * (reply_starts_after + interrupt_after)), dtype=np.int16)
+    second = synthetic_utterance(1, seconds=1.0, sample_rate=sample_rate)
+    return np.concatenate([first, gap, second])
+
+
+async def run_once(pipeline, tts, audio, output_latency):
+    source = ArraySource(audio, sample_rate=TTS_SAMPLE_RATE).start()
+    player = FakeAudioPlayer(output_latency=output_latency).start()
+    audio_input = StreamedAudioInput()
+    tts_chars = tts.chars
+    try:
+        result = await pipeline.run(audio_input)
+        capture = asyncio.create_task(
+            stream_microphone(audio_input, EnergyEndpointer(sample_rate=TTS_SAMPLE_RATE), source=source)
+        )
+        interrupted = await play_interruptible(result, player, source, listen_after=capture)
+    finally:
+        player.close()
+    return {
+        "interrupted": interrupted is not None,
+        "cancel_to_silence_ms": interrupted["cancel_to_silence_ms"] if interrupted else None,
+        "played_ms": 1000 * player.frames_played / TTS_SAMPLE_RATE,
+        "dropped_ms": 1000 * player.frames_dropped / TTS_SAMPLE_RATE,
+        "tts_chars": tts.chars - tts_chars,
+    }
+
+
+async def run(args):
+    set_tracing_disabled(True)
+    stt = FakeSTTModel(latency=args.stt_latency)
+    llm = FakeLLM(first_token_latency=args.llm_latency)
+    tts = FakeTTSModel(first_byte_latency=args.tts_latency)
+    pipeline = fake_pipeline(
+        agent,
+        llm_provider=FakeModelProvider(llm),
+        voice_provider=FakeVoiceModelProvider(stt, tts),
+    )
+    # Endpointing silence plus model latencies, before the first reply audio plays
+    reply_starts_after = (
+        AUDIO_CONFIG["endpoint_silence_ms"] / 1000 + args.stt_latency + args.llm_latency + args.tts_latency
+    )
+    audio = conversation_audio(reply_starts_after, args.interrupt_after)
+
+    runs = [await run_once(pipeline, tts, audio, args.output_latency) for _ in range(args.runs)]
+    cut = [r for r in runs if r["interrupted"]]
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "interrupted_runs": len(cut),
+        "cancel_to_silence_ms": summarize([r["cancel_to_silence_ms"] for r in cut]),
+        "played_ms": summarize([r["played_ms"] for r in runs]),
+        "dropped_ms": summarize([r["dropped_ms"] for r in runs]),
+        "tts_chars_per_run": sum(r["tts_chars"] for r in runs) / len(runs) if runs else 0,
+    }
+
+
+def print_report(report):
+    latency = report["cancel_to_silence_ms"]
+    print(f"interrupted {report['interrupted_runs']}/{report['config']['runs']} runs")
+    if latency["count"]:
+        print(f"cancel-to-silence ms: p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  max {latency['max']:.1f}")
+    print(
+        f"reply played {report['played_ms'].get('p50', 0):.0f} ms, dropped {report['dropped_ms'].get('p50', 0):.0f} ms, "
+        f"{report['tts_chars_per_run']:.0f} chars synthesized per run"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline barge-in cancel-to-silence benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--interrupt-after", type=float, default=0.8, help="seconds into the reply the user talks")
+    parser.add_argument("--output-latency", type=float, default=0.03, help="simulated output device latency (s)")
+    parser.add_argument("--stt-latency", type=float, default=0.15)
+    parser.add_argument("--llm-latency", type=float, default=0.35)
+    parser.add_argument("--tts-latency", type=float, default=0.12)
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
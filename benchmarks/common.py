@@ -0,0 +1,113 @@
+"""
+Measurement helpers shared by the benchmarks
+"""
+
+import asyncio
+import math
+import os
+import random
+import resource
+import time
+
+
+def latency_distribution(spec, rng=None):
+    """Turn a latency spec into seconds or a zero-argument sampler for the fakes.
+
+    "0.35" is a constant; "lognormal:MEAN:SD" and "uniform:LOW:HIGH" sample
+    a fresh value per call (all in seconds).
+    """
+    parts = str(spec).split(":")
+    if len(parts) == 1:
+        return float(parts[0])
+    rng = rng or random.Random()
+    kind, a, b = parts[0], float(parts[1]), float(parts[2])
+    if kind == "uniform":
+        return lambda: rng.uniform(a, b)
+    if kind == "lognormal":
+        if a <= 0:
+            return 0.0
+        # Parameters of the underlying normal for the requested mean and standard deviation
+        sigma = math.sqrt(math.log(1 + (b / a) ** 2))
+        mu = math.log(a) - sigma ** 2 / 2
+        return lambda: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"Unknown latency distribution {spec!r}")
+
+
+def process_usage():
+    """CPU seconds used and resident memory of this process, in MiB"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    rss_mib = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss_mib = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        pass
+    return {
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        "rss_mib": rss_mib,
+        "max_rss_mib": usage.ru_maxrss / 1024,  # KiB on Linux
+    }
+
+
+class LoopMonitor:
+    """Measure how long the event loop is blocked, from the lateness of a periodic tick.
+
+    Every `interval` seconds a task wakes up; any delay beyond the interval is
+    time the loop spent unable to run it. `snapshot()` returns the totals since
+    the last `reset()`.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._task = None
+        self.reset()
+
+    def reset(self):
+        self.blocked = 0.0
+        self.max_lag = 0.0
+        self.ticks = 0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.blocked += lag
+            self.max_lag = max(self.max_lag, lag)
+            self.ticks += 1
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self):
+        return {"loop_blocked_ms": 1000 * self.blocked, "loop_max_lag_ms": 1000 * self.max_lag}
+
+
+async def timed_turn(pipeline, audio_input):
+    """Run one turn to completion; returns time-to-first-audio and total time in ms"""
+    start = time.perf_counter()
+    first_audio = None
+    audio_chunks = 0
+    result = await pipeline.run(audio_input)
+    async for event in result.stream():
+        if event.type == "voice_stream_event_audio":
+            audio_chunks += 1
+            if first_audio is None:
+                first_audio = time.perf_counter()
+    end = time.perf_counter()
+    return {
+        "ttfa_ms": 1000 * (first_audio - start) if first_audio is not None else None,
+        "total_ms": 1000 * (end - start),
+        "audio_chunks": audio_chunks,
+    }
@@ -0,0 +1,394 @@
+"""
+Deterministic local stand-ins for the STT, LLM and TTS models.
+
+They implement the Agents SDK provider interfaces, so the real agent graph in
+agents_setup.py (tools, handoffs and all) runs unchanged with no network:
+
+    run_config = RunConfig(model_provider=FakeModelProvider(), tracing_disabled=True)
+    voice_config = VoicePipelineConfig(model_provider=FakeVoiceModelProvider(), tracing_disabled=True)
+
+Latencies can be a number of seconds or a zero-argument callable returning
+one, so load tests can inject distributions.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import time
+
+import numpy as np
+from agents.items import ModelResponse
+from agents.models.interface import Model, ModelProvider
+from agents.usage import Usage
+from agents.voice import STTModel, StreamedTranscriptionSession, TTSModel, VoiceModelProvider
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails, ResponseUsage
+
+from intent import weather_cities
+from language_id import detect_language
+
+TTS_SAMPLE_RATE = 24000
+
+_ids = itertools.count(1)
+
+
+def _delay(latency):
+    return latency() if callable(latency) else latency
+
+
+def audio_key(buffer):
+    """Stable key for an audio buffer, used to map synthetic audio to transcripts"""
+    return hashlib.sha1(np.ascontiguousarray(buffer).tobytes()).hexdigest()
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+class FakeSTTModel(STTModel):
+    """Return a registered transcript for each known audio buffer after `latency`"""
+
+    def __init__(self, transcripts=None, default="Hello there.", latency=0.15):
+        self.transcripts = dict(transcripts or {})
+        self.default = default
+        self.latency = latency
+        self.calls = 0
+
+    def register(self, buffer, transcript):
+        self.transcripts[audio_key(buffer)] = transcript
+
+    @property
+    def model_name(self):
+        return "fake-stt"
+
+    def _lookup(self, buffer):
+        return self.transcripts.get(audio_key(buffer), self.default)
+
+    async def transcribe(self, input, settings, trace_include_sensitive_data, trace_include_sensitive_audio_data):
+        self.calls += 1
+        await asyncio.sleep(_delay(self.latency))
+        return self._lookup(input.buffer)
+
+    async def create_session(self, input, settings, trace_include_sensitive_data, trace_include_sensitive_audio_data):
+        return FakeTranscriptionSession(self, input)
+
+
+class FakeTranscriptionSession(StreamedTranscriptionSession):
+    """Collect streamed audio until the end-of-stream sentinel, then emit one turn"""
+
+    def __init__(self, model, input):
+        self.model = model
+        self.input = input
+
+    async def transcribe_turns(self):
+        chunks = []
+        while True:
+            chunk = await self.input.queue.get()
+            if chunk is None:
+                break
+            chunks.append(chunk)
+        if chunks:
+            self.model.calls += 1
+            await asyncio.sleep(_delay(self.model.latency))
+            yield self.model._lookup(np.concatenate(chunks))
+
+    async def close(self):
+        pass
+
+
+class FakeTTSModel(TTSModel):
+    """Stream a quiet tone whose length follows the text, in fixed-size chunks"""
+
+    def __init__(self, first_byte_latency=0.12, chunk_interval=0.01, chunk_ms=100, ms_per_char=55):
+        self.first_byte_latency = first_byte_latency
+        self.chunk_interval = chunk_interval
+        self.chunk_samples = int(TTS_SAMPLE_RATE * chunk_ms / 1000)
+        self.ms_per_char = ms_per_char
+        t = np.arange(self.chunk_samples) / TTS_SAMPLE_RATE
+        self._chunk = (1000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16).tobytes()
+        self.calls = 0
+        self.chars = 0
+
+    @property
+    def model_name(self):
+        return "fake-tts"
+
+    async def run(self, text, settings):
+        self.calls += 1
+        self.chars += len(text)
+        n_chunks = max(1, int(len(text) * self.ms_per_char / 1000 * TTS_SAMPLE_RATE / self.chunk_samples))
+        await asyncio.sleep(_delay(self.first_byte_latency))
+        for i in range(n_chunks):
+            if i:
+                await asyncio.sleep(_delay(self.chunk_interval))
+            yield self._chunk
+
+
+class FakeVoiceModelProvider(VoiceModelProvider):
+    def __init__(self, stt=None, tts=None):
+        self.stt = stt or FakeSTTModel()
+        self.tts = tts or FakeTTSModel()
+
+    def get_stt_model(self, model_name):
+        return self.stt
+
+    def get_tts_model(self, model_name):
+        return self.tts
+
+
+class FakeAudioPlayer:
+    """AudioPlayer stand-in whose "sound card" is a task consuming blocks in real time.
+
+    It has the same interface as playback.AudioPlayer (enqueue, drain,
+    flush, wait_flushed, output_latency), so barge-in can be measured
+    without an audio device. `output_latency` models the device's own delay.
+    """
+
+    def __init__(self, sample_rate=TTS_SAMPLE_RATE, block_ms=20, buffer_ms=3000, output_latency=0.03):
+        self.sample_rate = sample_rate
+        self.block_size = int(sample_rate * block_ms / 1000)
+        self.capacity = int(sample_rate * buffer_ms / 1000)
+        self.output_latency = output_latency
+        self.buffered = 0
+        self.frames_played = 0
+        self.frames_dropped = 0
+        self._changed = None
+        self._flushed = None
+        self._flush_pending = False
+        self._task = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self._changed = asyncio.Condition()
+        self._flushed = loop.create_future()
+        self._task = asyncio.create_task(self._device())
+        return self
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _device(self):
+        interval = self.block_size / self.sample_rate
+        while True:
+            await asyncio.sleep(interval)
+            if self._flush_pending:
+                self._flush_pending = False
+                if not self._flushed.done():
+                    self._flushed.set_result(time.perf_counter())
+            played = min(self.block_size, self.buffered)
+            self.buffered -= played
+            self.frames_played += played
+            async with self._changed:
+                self._changed.notify_all()
+
+    async def enqueue(self, data):
+        n = len(np.asarray(data).reshape(-1))
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.buffered + n <= self.capacity or self.buffered == 0)
+            self.buffered += n
+
+    async def drain(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.buffered == 0)
+
+    def flush(self):
+        self.frames_dropped += self.buffered
+        self.buffered = 0
+        self._flush_pending = True
+        if self._flushed.done():
+            self._flushed = asyncio.get_running_loop().create_future()
+
+    async def wait_flushed(self, timeout=1.0):
+        return await asyncio.wait_for(asyncio.shield(self._flushed), timeout)
+
+
+def _field(item, name, default=None):
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+
+class FakeLLM(Model):
+    """Scripted stand-in for gpt-4o that exercises tools and handoffs.
+
+    - A weather question ("weather in X") on an agent with fetch_weather
+      calls the tool, then answers from its output. One naming several
+      cities calls fetch_weather_bulk once instead, if the agent has it.
+    - A Spanish transcript on an agent with a Spanish handoff hands off.
+    - Anything else gets a canned reply in the agent's language.
+    Text is streamed in `chunk_chars` pieces after `first_token_latency`.
+    """
+
+    def __init__(self, first_token_latency=0.35, token_interval=0.015, chunk_chars=12):
+        self.first_token_latency = first_token_latency
+        self.token_interval = token_interval
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+        self._weather_calls = set()
+
+    def _plan(self, system_instructions, input, tools, handoffs):
+        """Decide on ("tool", name, args) or ("text", reply)"""
+        items = [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+        transcript = ""
+        for item in items:
+            if _field(item, "role") == "user" and isinstance(_field(item, "content"), str):
+                transcript = _field(item, "content")
+        last = items[-1] if items else None
+
+        if last is not None and _field(last, "type") == "function_call_output":
+            if _field(last, "call_id") in self._weather_calls:
+                return ("text", f"Here's what I found. {_field(last, 'output')}.")
+
+        tool_names = {tool.name for tool in tools}
+        handoff_tools = {h.agent_name: h.tool_name for h in handoffs}
+        language, _ = detect_language(transcript)
+        handed_off = last is not None and _field(last, "type") == "function_call_output"
+
+        if not handed_off and language == "es" and "SpanishAgent" in handoff_tools:
+            return ("tool", handoff_tools["SpanishAgent"], {})
+        cities = weather_cities(transcript)
+        if len(cities) > 1 and "fetch_weather_bulk" in tool_names and not handed_off:
+            return ("tool", "fetch_weather_bulk", {"cities": cities})
+        if len(cities) == 1 and "fetch_weather" in tool_names and not handed_off:
+            return ("tool", "fetch_weather", {"city": cities[0]})
+
+        instructions = system_instructions or ""
+        if "replies in Spanish" in instructions:
+            return ("text", "¡Claro! Con mucho gusto te ayudo con eso. ¿Algo más?")
+        if "replies in Urdu" in instructions:
+            return ("text", "جی ضرور، میں آپ کی مدد کر سکتا ہوں۔ اور کچھ؟")
+        return ("text", "Sure, I'd be happy to help with that. Is there anything else?")
+
+    def _usage(self, system_instructions, input, output_text):
+        input_text = (system_instructions or "") + json.dumps(input, default=str)
+        input_tokens = estimate_tokens(input_text)
+        output_tokens = estimate_tokens(output_text)
+        return ResponseUsage.model_construct(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+            input_tokens_details=InputTokensDetails.model_construct(cached_tokens=0),
+            output_tokens_details=OutputTokensDetails.model_construct(reasoning_tokens=0),
+        )
+
+    def _output(self, plan):
+        if plan[0] == "tool":
+            _, name, args = plan
+            call_id = f"call_{next(_ids)}"
+            if name in ("fetch_weather", "fetch_weather_bulk"):
+                self._weather_calls.add(call_id)
+            return ResponseFunctionToolCall.model_construct(
+                id=f"fc_{call_id}",
+                call_id=call_id,
+                name=name,
+                arguments=json.dumps(args),
+                type="function_call",
+                status="completed",
+            ), ""
+        text = plan[1]
+        return ResponseOutputMessage.model_construct(
+            id=f"msg_{next(_ids)}",
+            role="assistant",
+            status="completed",
+            type="message",
+            content=[ResponseOutputText.model_construct(type="output_text", text=text, annotations=[])],
+        ), text
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(_delay(self.first_token_latency))
+        item, text = self._output(self._plan(system_instructions, input, tools, handoffs))
+        usage = self._usage(system_instructions, input, text or item.arguments)
+        return ModelResponse(
+            output=[item],
+            usage=Usage(
+                requests=1,
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                total_tokens=usage.total_tokens,
+            ),
+            response_id=f"resp_{next(_ids)}",
+        )
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(_delay(self.first_token_latency))
+        item, text = self._output(self._plan(system_instructions, input, tools, handoffs))
+        sequence = itertools.count()
+        for i in range(0, len(text), self.chunk_chars):
+            if i:
+                await asyncio.sleep(_delay(self.token_interval))
+            yield ResponseTextDeltaEvent.model_construct(
+                type="response.output_text.delta",
+                item_id=item.id,
+                output_index=0,
+                content_index=0,
+                delta=text[i:i + self.chunk_chars],
+                logprobs=[],
+                sequence_number=next(sequence),
+            )
+        response = Response.model_construct(
+            id=f"resp_{next(_ids)}",
+            object="response",
+            model="fake-llm",
+            output=[item],
+            usage=self._usage(system_instructions, input, text or item.arguments),
+            status="completed",
+            tools=[],
+            parallel_tool_calls=False,
+            tool_choice="auto",
+        )
+        yield ResponseCompletedEvent.model_construct(
+            type="response.completed", response=response, sequence_number=next(sequence)
+        )
+
+
+class FakeModelProvider(ModelProvider):
+    """Hand every agent the same FakeLLM, whatever model name it asks for"""
+
+    def __init__(self, llm=None):
+        self.llm = llm or FakeLLM()
+
+    def get_model(self, model_name):
+        return self.llm
+
+
+def fake_pipeline(agent, llm_provider=None, voice_provider=None, language_routes=None, response_cache=None,
+                  prefetcher=None, tts_settings=None):
+    """Build a VoicePipeline for `agent` that runs entirely on the fakes above"""
+    from agents import RunConfig
+    from agents.voice import TTSModelSettings, VoicePipeline, VoicePipelineConfig
+
+    from workflow import AgentVoiceWorkflow
+
+    workflow = AgentVoiceWorkflow(
+        agent,
+        run_config=RunConfig(model_provider=llm_provider or FakeModelProvider(), tracing_disabled=True),
+        language_routes=language_routes,
+        response_cache=response_cache,
+        prefetcher=prefetcher,
+    )
+    config = VoicePipelineConfig(
+        model_provider=voice_provider or FakeVoiceModelProvider(),
+        tts_settings=tts_settings or TTSModelSettings(),
+        tracing_disabled=True,
+    )
+    return VoicePipeline(workflow=workflow, config=config)
+
+
+def synthetic_utterance(index, seconds=1.0, sample_rate=TTS_SAMPLE_RATE):
+    """A distinct int16 tone per index, so each can be mapped to its own transcript"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (8000 * np.sin(2 * np.pi * (180 + 15 * index) * t)).astype(np.int16)
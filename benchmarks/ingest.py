@@ -0,0 +1,86 @@
+"""
+Microbenchmark: recorder WAV -> pipeline input, legacy path vs audio_ingest
+
+    python -m benchmarks.ingest --seconds 10 --repeat 20
+    python -m benchmarks.ingest --input-rate 24000   # recorder already at the pipeline rate
+"""
+
+import argparse
+import io
+import json
+import time
+
+import numpy as np
+
+from audio_ingest import ingest_wav
+from config import AUDIO_CONFIG
+
+WAV_HEADER_BYTES = 44
+
+
+def make_recording(seconds, sample_rate=44100, channels=2):
+    """Synthesize a recorder-style int16 WAV (speech-band tone plus noise)"""
+    import scipy.io.wavfile as wavfile
+
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * np.random.default_rng(0).standard_normal(t.size)
+    pcm = (signal * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    wavfile.write(buffer, sample_rate, np.repeat(pcm[:, None], channels, axis=1))
+    return buffer.getvalue()
+
+
+def legacy_ingest(audio_bytes):
+    """The previous streamlit_app.convert_audio_bytes_to_numpy"""
+    import scipy.io.wavfile as wavfile
+
+    sample_rate, audio_data = wavfile.read(io.BytesIO(audio_bytes))
+    if audio_data.dtype == np.int16:
+        audio_data = audio_data.astype(np.float32) / 32768.0
+    if len(audio_data.shape) > 1:
+        audio_data = audio_data[:, 0]
+    return audio_data, sample_rate
+
+
+def measure(fn, audio_bytes, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        samples, _ = fn(audio_bytes)
+    cpu = (time.process_time() - start) / repeat
+    # AudioInput uploads int16 WAV regardless of the buffer dtype.
+    return cpu, samples.size * 2 + WAV_HEADER_BYTES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--input-rate", type=int, default=44100, help="sample rate of the synthesized recording")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    audio_bytes = make_recording(args.seconds, args.input_rate)
+    results = {}
+    for name, fn in (("legacy", legacy_ingest), ("audio_ingest", ingest_wav)):
+        cpu, uploaded = measure(fn, audio_bytes, args.repeat)
+        results[name] = {
+            "cpu_ms_per_audio_second": 1000 * cpu / args.seconds,
+            "upload_bytes_per_audio_second": uploaded / args.seconds,
+        }
+    results["input_sample_rate"] = args.input_rate
+    results["pipeline_sample_rate"] = AUDIO_CONFIG["sample_rate"]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.seconds:g}s {args.input_rate / 1000:g} kHz stereo recording -> {AUDIO_CONFIG['sample_rate']} Hz pipeline input")
+    for name in ("legacy", "audio_ingest"):
+        r = results[name]
+        print(
+            f"  {name:<13} {r['cpu_ms_per_audio_second']:7.3f} ms CPU/s   "
+            f"{r['upload_bytes_per_audio_second'] / 1024:7.1f} KiB uploaded/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Concurrent-session load generator for capacity planning.
+
+N synthetic users each replay utterances from a WAV corpus (or synthetic
+tones) turn after turn against the real agents_setup graph, on the fake
+STT/LLM/TTS models and the stub weather server, with latencies drawn from
+the given distributions. Concurrency is swept level by level and each level
+reports throughput, turn latency percentiles, event-loop lag, CPU and memory:
+
+    python -m benchmarks.load --concurrency 1 4 16 64 --duration 20 \\
+        --llm-latency lognormal:0.35:0.1 --output capacity.json
+
+The JSON "levels" list is the capacity curve; compare it across versions.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from agents import set_tracing_disabled
+from agents.voice import AudioInput
+
+from agents_setup import agent, language_agents
+from audio_ingest import load_wav
+from benchmarks.common import LoopMonitor, latency_distribution, process_usage, timed_turn
+from benchmarks.fakes import (
+    FakeLLM,
+    FakeModelProvider,
+    FakeSTTModel,
+    FakeTTSModel,
+    FakeVoiceModelProvider,
+    fake_pipeline,
+    synthetic_utterance,
+)
+from benchmarks.stub_weather import StubWeatherServer
+from benchmarks.turn_latency import SCENARIOS
+from config import AUDIO_CONFIG
+from connections import close_clients
+from memory import ConversationMemory
+from metrics import summarize
+from workflow import record_turn
+
+
+def load_corpus(corpus_dir, transcripts_file, stt):
+    """Return the utterances to replay, registering each one's transcript with the fake STT.
+
+    Without a corpus, one synthetic utterance per turn_latency scenario is
+    used. With one, transcripts come from a {"file.wav": "text"} JSON file,
+    falling back to the scenario texts in turn.
+    """
+    texts = list(SCENARIOS.values())
+    if not corpus_dir:
+        utterances = []
+        for index, text in enumerate(texts):
+            audio = synthetic_utterance(index)
+            stt.register(audio, text)
+            utterances.append(audio)
+        return utterances
+
+    mapping = {}
+    if transcripts_file:
+        with open(transcripts_file, encoding="utf-8") as f:
+            mapping = json.load(f)
+    utterances = []
+    names = sorted(name for name in os.listdir(corpus_dir) if name.lower().endswith(".wav"))
+    for index, name in enumerate(names):
+        audio, _ = load_wav(os.path.join(corpus_dir, name), AUDIO_CONFIG["sample_rate"])
+        stt.register(audio, mapping.get(name, texts[index % len(texts)]))
+        utterances.append(audio)
+    if not utterances:
+        raise SystemExit(f"No .wav files in {corpus_dir}")
+    return utterances
+
+
+async def user(pipeline, utterances, deadline, think_time, rng, samples, errors):
+    """One synthetic user: keep taking turns, with its own conversation memory, until the deadline"""
+    memory = ConversationMemory()
+    while time.monotonic() < deadline:
+        audio = rng.choice(utterances)
+        record_turn(memory)
+        try:
+            samples.append(await timed_turn(pipeline, AudioInput(buffer=audio)))
+        except Exception as e:
+            errors.append(repr(e))
+        await asyncio.sleep(think_time() if callable(think_time) else think_time)
+
+
+async def run_level(pipeline, utterances, concurrency, args, rng):
+    samples, errors = [], []
+    monitor = LoopMonitor().start()
+    before = process_usage()
+    start = time.monotonic()
+    deadline = start + args.duration
+    think_time = latency_distribution(args.think_time, rng)
+    # Stagger arrivals over one second so the users don't all start in lockstep.
+    users = []
+    for i in range(concurrency):
+        await asyncio.sleep(1.0 / concurrency)
+        users.append(asyncio.create_task(
+            user(pipeline, utterances, deadline, think_time, random.Random(rng.random()), samples, errors)
+        ))
+    await asyncio.gather(*users)
+    elapsed = time.monotonic() - start
+    after = process_usage()
+    await monitor.stop()
+    loop = monitor.snapshot()
+    return {
+        "concurrency": concurrency,
+        "turns": len(samples),
+        "errors": len(errors),
+        "throughput_turns_per_s": len(samples) / elapsed,
+        "ttfa_ms": summarize([s["ttfa_ms"] for s in samples if s["ttfa_ms"] is not None]),
+        "turn_ms": summarize([s["total_ms"] for s in samples]),
+        "loop_blocked_ms": loop["loop_blocked_ms"],
+        "loop_max_lag_ms": loop["loop_max_lag_ms"],
+        "cpu_utilization": (after["cpu_s"] - before["cpu_s"]) / elapsed,
+        "rss_mib": after["rss_mib"],
+        "max_rss_mib": after["max_rss_mib"],
+    }
+
+
+async def run(args):
+    set_tracing_disabled(True)
+    rng = random.Random(args.seed)
+    stt = FakeSTTModel(latency=latency_distribution(args.stt_latency, rng))
+    llm = FakeLLM(first_token_latency=latency_distribution(args.llm_latency, rng))
+    tts = FakeTTSModel(first_byte_latency=latency_distribution(args.tts_latency, rng))
+    pipeline = fake_pipeline(
+        agent,
+        llm_provider=FakeModelProvider(llm),
+        voice_provider=FakeVoiceModelProvider(stt, tts),
+        language_routes=language_agents,
+    )
+    utterances = load_corpus(args.corpus, args.transcripts, stt)
+
+    levels = []
+    with StubWeatherServer(delay=latency_distribution(args.weather_latency, random.Random(args.seed))) as server:
+        os.environ["WEATHER_API_KEY"] = "load-test"
+        os.environ["WEATHER_API_URL"] = server.url
+        try:
+            for concurrency in args.concurrency:
+                level = await run_level(pipeline, utterances, concurrency, args, rng)
+                levels.append(level)
+                print_level(level)
+                if args.max_p95_ttfa_ms and level["ttfa_ms"].get("p95", 0) > args.max_p95_ttfa_ms:
+                    print(f"p95 time-to-first-audio above {args.max_p95_ttfa_ms:.0f} ms; stopping the sweep")
+                    break
+        finally:
+            await close_clients()
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "utterances": len(utterances),
+        "levels": levels,
+    }
+
+
+def print_level(level):
+    ttfa, turn = level["ttfa_ms"], level["turn_ms"]
+    rss = f"{level['rss_mib']:.0f}" if level["rss_mib"] is not None else "?"
+    print(
+        f"users {level['concurrency']:>4}  {level['throughput_turns_per_s']:6.2f} turns/s  "
+        f"TTFA p50/p95/p99 {ttfa.get('p50', 0):.0f}/{ttfa.get('p95', 0):.0f}/{ttfa.get('p99', 0):.0f} ms  "
+        f"turn p95 {turn.get('p95', 0):.0f} ms  loop lag max {level['loop_max_lag_ms']:.1f} ms  "
+        f"CPU {100 * level['cpu_utilization']:.0f}%  RSS {rss} MiB  errors {level['errors']}"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent voice-session load generator")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds to run each concurrency level")
+    parser.add_argument("--corpus", help="directory of WAV utterances to replay (default: synthetic tones)")
+    parser.add_argument("--transcripts", help='JSON {"file.wav": "transcript"} for the corpus')
+    parser.add_argument("--think-time", default="uniform:0.5:1.5", help="pause between a user's turns")
+    parser.add_argument("--stt-latency", default="lognormal:0.15:0.05",
+                        help='seconds, "lognormal:MEAN:SD" or "uniform:LOW:HIGH"')
+    parser.add_argument("--llm-latency", default="lognormal:0.35:0.1", help="fake LLM time to first token")
+    parser.add_argument("--tts-latency", default="lognormal:0.12:0.04", help="fake TTS time to first byte")
+    parser.add_argument("--weather-latency", default="lognormal:0.08:0.03")
+    parser.add_argument("--max-p95-ttfa-ms", type=float, help="stop the sweep once p95 TTFA exceeds this")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the capacity curve to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
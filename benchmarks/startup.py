@@ -0,0 +1,132 @@
+"""
+Cold-start benchmark for the entry points.
+
+Each entry point is imported in a fresh interpreter with `-X importtime`, so
+nothing is shared with this process, and `cli.py --help` is timed end to end.
+The slowest modules by cumulative import time are listed so a heavy import
+that crept back onto the startup path is easy to spot:
+
+    python -m benchmarks.startup --repeat 5 --output startup.json
+
+Exits with status 1 when an entry point fails to start or its median
+exceeds its limit (DEFAULT_MAX_MS, overridden with --max-ms NAME=MS), so the
+plain command above is the CI regression check. The defaults leave about 3x
+headroom over the lazy-import startup; importing the Agents SDK, numpy and
+sounddevice eagerly costs over two seconds and trips them.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (interpreter arguments, whether to collect -X importtime output)
+ENTRY_POINTS = {
+    "cli": (["-X", "importtime", "-c", "import cli"], True),
+    "streamlit_app": (["-X", "importtime", "-c", "import streamlit_app"], True),
+    "cli_help": (["cli.py", "--help"], False),
+}
+
+# Median cold-start limits in milliseconds
+DEFAULT_MAX_MS = {
+    "cli": 500,
+    "streamlit_app": 2000,
+    "cli_help": 600,
+}
+
+
+def parse_importtime(stderr):
+    """Return {module: cumulative_us} from `-X importtime` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        modules[name] = max(modules.get(name, 0), int(cumulative))
+    return modules
+
+
+def run_once(argv, importtime):
+    """Run one cold interpreter; return (wall ms, {module: cumulative us} or None, error or None)"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *argv], cwd=ROOT, env=env, capture_output=True, text=True)
+    wall_ms = 1000 * (time.perf_counter() - start)
+    modules = parse_importtime(proc.stderr) if importtime else None
+    error = None
+    if proc.returncode != 0:
+        error = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")][-1:]
+        error = error[0] if error else f"exit status {proc.returncode}"
+    return wall_ms, modules, error
+
+
+def measure(name, repeat, top):
+    argv, importtime = ENTRY_POINTS[name]
+    walls, modules, error = [], {}, None
+    for _ in range(repeat):
+        wall_ms, run_modules, error = run_once(argv, importtime)
+        walls.append(wall_ms)
+        for module, us in (run_modules or {}).items():
+            modules.setdefault(module, []).append(us)
+    slowest = sorted(((statistics.median(us) / 1000, module) for module, us in modules.items()), reverse=True)
+    return {
+        "median_ms": statistics.median(walls),
+        "min_ms": min(walls),
+        "error": error,
+        "top_imports": [{"module": module, "cumulative_ms": ms} for ms, module in slowest[:top]],
+    }
+
+
+def parse_thresholds(values):
+    thresholds = dict(DEFAULT_MAX_MS)
+    for value in values:
+        name, _, ms = value.partition("=")
+        if name not in ENTRY_POINTS or not ms:
+            raise SystemExit(f"--max-ms expects NAME=MS with NAME one of {', '.join(ENTRY_POINTS)}")
+        thresholds[name] = float(ms)
+    return thresholds
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start time of the CLI and Streamlit entry points")
+    parser.add_argument("--entry", choices=list(ENTRY_POINTS), nargs="+", default=list(ENTRY_POINTS))
+    parser.add_argument("--repeat", type=int, default=5, help="cold runs per entry point; the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list per entry point")
+    parser.add_argument("--max-ms", action="append", default=[], metavar="NAME=MS",
+                        help="fail if NAME's median exceeds MS instead of its default limit, e.g. cli=400 (repeatable)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    thresholds = parse_thresholds(args.max_ms)
+    results = {}
+    failures = []
+    for name in args.entry:
+        result = results[name] = measure(name, args.repeat, args.top)
+        print(f"{name:<14} median {result['median_ms']:6.0f} ms  min {result['min_ms']:6.0f} ms"
+              + (f"  (failed: {result['error']})" if result["error"] else ""))
+        for entry in result["top_imports"]:
+            print(f"    {entry['cumulative_ms']:7.1f} ms  {entry['module']}")
+        limit = thresholds.get(name)
+        if result["error"]:
+            failures.append(f"{name}: failed to start ({result['error']})")
+        elif limit is not None and result["median_ms"] > limit:
+            failures.append(f"{name}: {result['median_ms']:.0f} ms > {limit:.0f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"repeat": args.repeat, "thresholds": thresholds, "results": results}, f, indent=2)
+    if failures:
+        print("Startup regression: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Local stub of the OpenWeather API with injectable latency and failures.
+
+    with StubWeatherServer(delay=0.08) as server:
+        os.environ["WEATHER_API_URL"] = server.url
+        ...
+        print(server.stats())
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+UNKNOWN_CITIES = {"atlantis", "el dorado"}
+
+
+def _delay(latency):
+    return latency() if callable(latency) else latency
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def setup(self):
+        super().setup()
+        self.server.stub._count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub._count("requests")
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        time.sleep(_delay(stub.delay))
+
+        if stub.failure_rate and stub._rng.random() < stub.failure_rate:
+            stub._count("failures")
+            return self._send(500, {"cod": 500, "message": "injected failure"})
+        if url.path.endswith("/weather"):
+            return self._send(200, stub.weather_for(query.get("q", [""])[0]))
+        return self._send(404, {"cod": "404", "message": "unknown endpoint"})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up, e.g. a hedged request that lost the race
+
+
+class StubWeatherServer:
+    """Serve fake OpenWeather responses from a background thread on localhost"""
+
+    def __init__(self, delay=0.05, failure_rate=0.0, port=0, seed=0):
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {"connections": 0, "requests": 0, "failures": 0}
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/data/2.5"
+
+    def weather_for(self, city):
+        if city.strip().casefold() in UNKNOWN_CITIES:
+            return {"cod": "404", "message": "city not found"}
+        # Deterministic per city so cached and fresh answers compare equal.
+        seed = sum(city.casefold().encode())
+        return {
+            "cod": 200,
+            "name": city,
+            "main": {"temp": round(5 + seed % 25 + (seed % 10) / 10, 1)},
+            "weather": [{"description": ("clear sky", "light rain", "broken clouds", "haze")[seed % 4]}],
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self._counts:
+                self._counts[name] = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-weather", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,129 @@
+"""
+Weather tool tail latency with and without the resilience layer.
+
+Calls tools.get_weather against the stub weather server, with a latency
+distribution plus occasional very slow responses and injected failures,
+once with a plain upstream (no deadline, hedging or circuit breaker) and
+once with RESILIENCE_CONFIG (or the overrides given here):
+
+    python -m benchmarks.tool_resilience --calls 300 --slow-rate 0.05 --slow-delay 3 --failure-rate 0.02
+
+Each mode reports tool latency percentiles, how many answers were the
+last known reading or no reading at all, upstream requests sent and the
+resilience decisions taken.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import tools
+from benchmarks.common import latency_distribution
+from benchmarks.stub_weather import StubWeatherServer
+from config import RESILIENCE_CONFIG
+from connections import close_clients
+from metrics import summarize
+from resilience import CircuitBreaker, ResilientCall
+
+CITIES = ["London", "Lahore", "Karachi", "Madrid", "Paris", "Tokyo", "Lima", "Oslo"]
+
+
+def upstream_for(mode, args):
+    if mode == "plain":
+        # Effectively unprotected: no hedges, an hour-long deadline and a breaker that never opens.
+        return ResilientCall("weather", deadline=3600.0, max_hedges=0,
+                             breaker=CircuitBreaker(failure_threshold=float("inf")))
+    return ResilientCall(
+        "weather",
+        deadline=args.deadline,
+        max_hedges=args.max_hedges,
+        breaker=CircuitBreaker(failure_threshold=args.failure_threshold),
+    )
+
+
+async def run_mode(mode, server, args):
+    tools.weather_upstream = upstream_for(mode, args)
+    tools.last_known_weather.clear()
+    server.reset_stats()
+    latencies, stale, unavailable = [], 0, 0
+    for i in range(args.calls):
+        # Always a cache miss, so every call goes to the upstream.
+        tools.weather_cache.clear()
+        start = time.perf_counter()
+        try:
+            await tools.get_weather(CITIES[i % len(CITIES)])
+        except tools.WeatherUnavailable as e:
+            if e.last_known is not None:
+                stale += 1
+            else:
+                unavailable += 1
+        latencies.append(1000 * (time.perf_counter() - start))
+    return {
+        "tool_ms": summarize(latencies),
+        "stale_answers": stale,
+        "unavailable_answers": unavailable,
+        "upstream_requests": server.stats()["requests"],
+        "decisions": tools.weather_upstream.stats(),
+    }
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    base = latency_distribution(args.latency, rng)
+
+    def delay():
+        if rng.random() < args.slow_rate:
+            return args.slow_delay
+        return base() if callable(base) else base
+
+    results = {}
+    with StubWeatherServer(delay=delay, failure_rate=args.failure_rate, seed=args.seed) as server:
+        os.environ["WEATHER_API_KEY"] = "benchmark"
+        os.environ["WEATHER_API_URL"] = server.url
+        try:
+            for mode in ("plain", "resilient"):
+                results[mode] = await run_mode(mode, server, args)
+                print_mode(mode, results[mode])
+        finally:
+            await close_clients()
+    return {"config": {k: v for k, v in vars(args).items() if k != "output"}, "modes": results}
+
+
+def print_mode(mode, result):
+    ms = result["tool_ms"]
+    decisions = {k: v for k, v in result["decisions"].items() if isinstance(v, int) and v}
+    print(
+        f"{mode:<10} p50 {ms['p50']:6.0f}  p95 {ms['p95']:6.0f}  p99 {ms['p99']:6.0f}  max {ms['max']:6.0f} ms  "
+        f"stale {result['stale_answers']}  unavailable {result['unavailable_answers']}  "
+        f"upstream requests {result['upstream_requests']}  {decisions}"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Weather tool tail latency with and without resilience")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", default="lognormal:0.08:0.03", help="stub response time in seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="fraction of responses delayed by --slow-delay")
+    parser.add_argument("--slow-delay", type=float, default=2.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with a 500")
+    parser.add_argument("--deadline", type=float, default=RESILIENCE_CONFIG["deadline"])
+    parser.add_argument("--max-hedges", type=int, default=RESILIENCE_CONFIG["max_hedges"])
+    parser.add_argument("--failure-threshold", type=int, default=RESILIENCE_CONFIG["failure_threshold"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+TTS text-splitting benchmark: time-to-first-audio and TTS requests per strategy.
+
+Runs each scenario through the fake pipeline once per split strategy
+(text_splitter.make_text_splitter) with the LLM streaming at a realistic
+token rate, so the effect of when the first chunk reaches TTS shows up:
+
+    python -m benchmarks.tts_split --turns 10 --strategies sentence adaptive
+"""
+
+import argparse
+import asyncio
+import json
+
+from agents import set_tracing_disabled
+from agents.voice import AudioInput, TTSModelSettings
+
+from agents_setup import agent, language_agents
+from benchmarks.common import timed_turn
+from benchmarks.fakes import (
+    FakeLLM,
+    FakeModelProvider,
+    FakeSTTModel,
+    FakeTTSModel,
+    FakeVoiceModelProvider,
+    fake_pipeline,
+    synthetic_utterance,
+)
+from metrics import summarize
+from text_splitter import make_text_splitter
+from workflow import current_record, record_turn
+
+SCENARIOS = {
+    "english": "Hello, how are you doing today?",
+    "spanish": "Hola, ¿qué tal? ¿Me puedes ayudar con algo hoy?",
+    "urdu": "السلام علیکم، آپ کیسے ہیں؟",
+}
+
+
+async def run_strategy(strategy, args):
+    stt = FakeSTTModel(latency=args.stt_latency)
+    llm = FakeLLM(first_token_latency=args.llm_latency, token_interval=args.token_interval,
+                  chunk_chars=args.llm_chunk_chars)
+    tts = FakeTTSModel(first_byte_latency=args.tts_latency)
+    settings = TTSModelSettings(text_splitter=make_text_splitter(strategy, turn_state=current_record))
+    pipeline = fake_pipeline(
+        agent,
+        llm_provider=FakeModelProvider(llm),
+        voice_provider=FakeVoiceModelProvider(stt, tts),
+        language_routes=language_agents,
+        tts_settings=settings,
+    )
+    results = {}
+    for index, name in enumerate(args.scenarios):
+        audio = synthetic_utterance(index)
+        stt.register(audio, SCENARIOS[name])
+        tts_calls = tts.calls
+        samples = []
+        for _ in range(args.turns):
+            record_turn()
+            samples.append(await timed_turn(pipeline, AudioInput(buffer=audio)))
+        results[name] = {
+            "ttfa_ms": summarize([s["ttfa_ms"] for s in samples if s["ttfa_ms"] is not None]),
+            "total_ms": summarize([s["total_ms"] for s in samples]),
+            "tts_calls_per_turn": (tts.calls - tts_calls) / args.turns,
+        }
+    return results
+
+
+async def run(args):
+    set_tracing_disabled(True)
+    report = {"config": {k: v for k, v in vars(args).items() if k != "output"}, "strategies": {}}
+    for strategy in args.strategies:
+        report["strategies"][strategy] = await run_strategy(strategy, args)
+    return report
+
+
+def print_report(report):
+    print(f"{'strategy':<10} {'scenario':<9} {'TTFA p50':>9} {'TTFA p95':>9} {'total p50':>10} {'TTS/turn':>9}")
+    for strategy, scenarios in report["strategies"].items():
+        for name, r in scenarios.items():
+            print(
+                f"{strategy:<10} {name:<9} {r['ttfa_ms'].get('p50', 0):9.1f} {r['ttfa_ms'].get('p95', 0):9.1f} "
+                f"{r['total_ms']['p50']:10.1f} {r['tts_calls_per_turn']:9.1f}"
+            )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline TTS text-splitting benchmark")
+    parser.add_argument("--turns", type=int, default=5, help="timed turns per scenario and strategy")
+    parser.add_argument("--strategies", nargs="+", choices=["sentence", "adaptive"], default=["sentence", "adaptive"])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--stt-latency", type=float, default=0.15)
+    parser.add_argument("--llm-latency", type=float, default=0.35, help="fake LLM time to first token")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="seconds between streamed text chunks")
+    parser.add_argument("--llm-chunk-chars", type=int, default=4)
+    parser.add_argument("--tts-latency", type=float, default=0.12, help="fake TTS time to first byte")
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
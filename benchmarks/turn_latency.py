@@ -0,0 +1,181 @@
+"""
+Offline end-to-end turn latency benchmark.
+
+Runs the real agents_setup graph (routing, handoff and the fetch_weather tool)
+on the local fake STT/LLM/TTS models and a stub weather server:
+
+    python -m benchmarks.turn_latency --turns 20 --output bench_output.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tracemalloc
+
+from agents import set_tracing_disabled
+from agents.voice import AudioInput
+
+from agents_setup import agent, language_agents
+from benchmarks.common import LoopMonitor, timed_turn
+from benchmarks.fakes import (
+    FakeLLM,
+    FakeModelProvider,
+    FakeSTTModel,
+    FakeTTSModel,
+    FakeVoiceModelProvider,
+    fake_pipeline,
+    synthetic_utterance,
+)
+from benchmarks.stub_weather import StubWeatherServer
+from connections import close_clients
+from metrics import summarize
+from response_cache import ResponseCache
+from speculation import WeatherPrefetcher
+
+SCENARIOS = {
+    "smalltalk": "Hello, how are you doing today?",
+    "weather": "What's the weather in London today?",
+    "multi_city_weather": "Compare the weather in Lahore, Karachi and Madrid.",
+    "spanish": "Hola, ¿qué tal? ¿Me puedes ayudar con algo hoy?",
+    "urdu": "السلام علیکم، آپ کیسے ہیں؟",
+}
+
+
+async def run_scenario(pipeline, audio, turns, monitor, warm_cache):
+    import tools
+
+    samples = []
+    for _ in range(turns):
+        if not warm_cache:
+            tools.weather_cache.clear()
+        monitor.reset()
+        timing = await timed_turn(pipeline, AudioInput(buffer=audio))
+        timing.update(monitor.snapshot())
+        samples.append(timing)
+
+    # One extra turn under tracemalloc; kept separate so tracing doesn't skew timings.
+    if not warm_cache:
+        tools.weather_cache.clear()
+    tracemalloc.start()
+    before_blocks = sys.getallocatedblocks()
+    base, _ = tracemalloc.get_traced_memory()
+    await timed_turn(pipeline, AudioInput(buffer=audio))
+    current, peak = tracemalloc.get_traced_memory()
+    after_blocks = sys.getallocatedblocks()
+    tracemalloc.stop()
+
+    return {
+        "ttfa_ms": summarize([s["ttfa_ms"] for s in samples if s["ttfa_ms"] is not None]),
+        "total_ms": summarize([s["total_ms"] for s in samples]),
+        "loop_blocked_ms": summarize([s["loop_blocked_ms"] for s in samples]),
+        "loop_max_lag_ms": summarize([s["loop_max_lag_ms"] for s in samples]),
+        "audio_chunks": samples[-1]["audio_chunks"] if samples else 0,
+        "alloc_peak_kib": (peak - base) / 1024,
+        "alloc_retained_kib": (current - base) / 1024,
+        "alloc_net_blocks": after_blocks - before_blocks,
+    }
+
+
+async def run(args):
+    set_tracing_disabled(True)
+    stt = FakeSTTModel(latency=args.stt_latency)
+    llm = FakeLLM(first_token_latency=args.llm_latency, chunk_chars=args.llm_chunk_chars)
+    tts = FakeTTSModel(first_byte_latency=args.tts_latency, chunk_ms=args.tts_chunk_ms)
+    response_cache = ResponseCache() if args.response_cache else None
+    prefetcher = WeatherPrefetcher() if args.prefetch else None
+    pipeline = fake_pipeline(
+        agent,
+        llm_provider=FakeModelProvider(llm),
+        voice_provider=FakeVoiceModelProvider(stt, tts),
+        language_routes=None if args.no_routing else language_agents,
+        response_cache=response_cache,
+        prefetcher=prefetcher,
+    )
+
+    results = {}
+    with StubWeatherServer(delay=args.weather_latency) as server:
+        os.environ["WEATHER_API_KEY"] = "benchmark"
+        os.environ["WEATHER_API_URL"] = server.url
+        monitor = LoopMonitor().start()
+        try:
+            for index, name in enumerate(args.scenarios):
+                audio = synthetic_utterance(index)
+                stt.register(audio, SCENARIOS[name])
+                llm_calls, tts_calls = llm.calls, tts.calls
+                server.reset_stats()
+                results[name] = await run_scenario(pipeline, audio, args.turns, monitor, args.warm_cache)
+                results[name]["llm_calls_per_turn"] = (llm.calls - llm_calls) / (args.turns + 1)
+                results[name]["tts_calls_per_turn"] = (tts.calls - tts_calls) / (args.turns + 1)
+                results[name]["weather_requests"] = server.stats()["requests"]
+        finally:
+            await monitor.stop()
+            await close_clients()
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "scenarios": results,
+    }
+    if response_cache is not None:
+        report["response_cache"] = response_cache.stats()
+    if prefetcher is not None:
+        report["prefetch"] = prefetcher.stats()
+    return report
+
+
+def print_report(report):
+    print(f"{'scenario':<10} {'TTFA p50':>9} {'TTFA p95':>9} {'total p50':>10} {'loop blk':>9} {'peak KiB':>9} {'LLM/turn':>9}")
+    for name, r in report["scenarios"].items():
+        print(
+            f"{name:<10} {r['ttfa_ms'].get('p50', 0):9.1f} {r['ttfa_ms'].get('p95', 0):9.1f} "
+            f"{r['total_ms']['p50']:10.1f} {r['loop_blocked_ms']['p50']:9.2f} "
+            f"{r['alloc_peak_kib']:9.1f} {r['llm_calls_per_turn']:9.1f}"
+        )
+    if "response_cache" in report:
+        cache_stats = report["response_cache"]
+        print(f"response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_ratio']:.0%})")
+    if "prefetch" in report:
+        prefetch = report["prefetch"]
+        print(f"weather prefetch: {prefetch['used']}/{prefetch['started']} used, {prefetch['wasted']} wasted, "
+              f"{prefetch['saved_ms_per_use']:.0f} ms saved per use")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline voice turn latency benchmark")
+    parser.add_argument("--turns", type=int, default=10, help="timed turns per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--stt-latency", type=float, default=0.15)
+    parser.add_argument("--llm-latency", type=float, default=0.35, help="fake LLM time to first token")
+    parser.add_argument("--llm-chunk-chars", type=int, default=12)
+    parser.add_argument("--tts-latency", type=float, default=0.12, help="fake TTS time to first byte")
+    parser.add_argument("--tts-chunk-ms", type=int, default=100)
+    parser.add_argument("--weather-latency", type=float, default=0.08)
+    parser.add_argument("--no-routing", action="store_true", help="disable local language routing")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the weather cache between turns")
+    parser.add_argument(
+        "--response-cache",
+        action="store_true",
+        help="answer repeated weather questions from the reply cache (pair with --warm-cache)",
+    )
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="start the weather lookup from the transcript, before the LLM calls the tool",
+    )
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
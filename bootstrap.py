@@ -0,0 +1,13 @@
+"""
+One-time environment bootstrap shared by every entry point
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def load_env():
+    """Load .env into os.environ once per process, however many modules ask for it"""
+    from dotenv import load_dotenv
+
+    return load_dotenv()
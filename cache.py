@@ -0,0 +1,78 @@
+"""
+Small in-process caches shared by the tools and the voice pipeline
+"""
+
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after `ttl` seconds.
+
+    Not thread-safe: each instance is meant to be used from one event loop.
+    """
+
+    def __init__(self, maxsize=256, ttl=600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _count=False) is not None
+
+    def get(self, key, default=None, _count=True):
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires = entry
+            if expires > self._clock():
+                self._data.move_to_end(key)
+                if _count:
+                    self.hits += 1
+                return value
+            del self._data[key]
+        if _count:
+            self.misses += 1
+        return default
+
+    def set(self, key, value, ttl=None):
+        expires = self._clock() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def ttl_remaining(self, key):
+        """Seconds until `key` expires, or None if it is absent or already expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        remaining = entry[1] - self._clock()
+        return remaining if remaining > 0 else None
+
+    def keys(self):
+        return list(self._data)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
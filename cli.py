@@ -1,38 +1,225 @@
+import argparse
 import asyncio
-import numpy as np
-import sounddevice as sd
-import os
-from dotenv import load_dotenv
 
-from agents.voice import AudioInput, SingleAgentVoiceWorkflow, VoicePipeline
-from agents_setup import agent
+# Only light modules load at startup; numpy, sounddevice and the Agents SDK
+# are imported by the functions that need them, after arguments are parsed.
+from bootstrap import load_env
+from config import AGENTS, AUDIO_CONFIG, BATCH_CONFIG, MEMORY_CONFIG, OPENAI_CONFIG, TTS_CACHE_CONFIG
+import metrics
 
-load_dotenv()
+load_env()
 
-async def main():
-    print("🎤 Speak into your mic...")
+async def main(mode="stream", duration=4, agent_name="Weather Agent", barge_in=False, input_wav=None):
+    from audio_capture import ArraySource, MicrophoneSource
+    from audio_ingest import load_wav
+    from connections import close_clients, warm_up
+    from memory import ConversationMemory
+    from registry import get_pipeline
+    from tts_cache import warm_tts_cache
 
-    pipeline = VoicePipeline(workflow=SingleAgentVoiceWorkflow(agent))
+    # Warm up once per session, not per turn; both run while the user starts talking.
+    warm_up_tasks = []
+    if OPENAI_CONFIG["warm_up"]:
+        warm_up_tasks.append(asyncio.create_task(warm_up()))
+    if TTS_CACHE_CONFIG["enabled"] and TTS_CACHE_CONFIG["warm_up"]:
+        warm_up_tasks.append(asyncio.create_task(warm_tts_cache(get_pipeline(agent_name))))
 
-    # Record real mic input
-    samplerate = 24000
-    duration = 4  # seconds
-    audio = sd.rec(int(samplerate * duration), samplerate=samplerate, channels=1, dtype=np.int16)
-    sd.wait()
+    source = None
+    if input_wav:
+        # Synthetic or recorded audio fed in place of the microphone, in real time
+        source = ArraySource(load_wav(input_wav)[0]).start()
+    elif barge_in:
+        # One mic stream for the whole conversation, so it can listen during playback too
+        source = MicrophoneSource().start()
+    memory = ConversationMemory() if MEMORY_CONFIG["enabled"] else None
+    try:
+        preroll = ()
+        while True:
+            reason, interrupted = await run_turn(mode, duration, agent_name, source, preroll, barge_in, memory)
+            # With barge-in the conversation continues until a turn gets no speech at all.
+            if not barge_in or reason == "no_speech":
+                break
+            preroll = interrupted["blocks"] if interrupted else ()
+    finally:
+        if source is not None:
+            source.close()
+        for task in warm_up_tasks:
+            if not task.done():
+                task.cancel()
+        await close_clients()
 
-    audio_input = AudioInput(buffer=audio.flatten())
+async def main_batch(source, out_dir, agent_name, concurrency, rate_limit, audio_format):
+    from batch import print_summary, run_batch
+    from connections import close_clients
 
-    result = await pipeline.run(audio_input)
+    try:
+        summary = await run_batch(source, out_dir, agent_name, concurrency, rate_limit, audio_format)
+    finally:
+        await close_clients()
+    print_summary(summary)
 
-    # Play AI response
-    player = sd.OutputStream(samplerate=samplerate, channels=1, dtype=np.int16)
-    player.start()
+async def capture_turn(audio_input, samplerate, source=None, preroll=()):
+    from audio_capture import EnergyEndpointer, stream_microphone
 
-    async for event in result.stream():
-        if event.type == "voice_stream_event_audio":
-            player.write(event.data)
+    with metrics.stage("record"):
+        return await stream_microphone(
+            audio_input, EnergyEndpointer(sample_rate=samplerate), source=source, preroll=preroll
+        )
 
-if __name__ == "__main__":
-    asyncio.run(main())
+async def run_turn(mode, duration, agent_name, source=None, preroll=(), barge_in=False, memory=None):
+    """Run one spoken turn; return (capture end reason, barge-in details or None)"""
+    import numpy as np
+    import sounddevice as sd
+    from agents.voice import AudioInput, StreamedAudioInput
+
+    from barge_in import play_interruptible
+    from playback import AudioPlayer
+    from registry import get_pipeline
+    from silence import trim_silence
+    from workflow import record_turn
+
+    pipeline = get_pipeline(agent_name)
+
+    if not preroll:
+        print("🎤 Speak into your mic...")
+    samplerate = AUDIO_CONFIG["sample_rate"]
+    timer = metrics.new_turn()
+    metrics.activate(timer)
+    record = record_turn(memory)
+
+    capture_task = None
+    if mode == "stream":
+        # Stream mic blocks into the pipeline so STT runs while the user is speaking;
+        # the endpointer closes the turn after AUDIO_CONFIG["endpoint_silence_ms"] of silence.
+        audio_input = StreamedAudioInput()
+        timer.mark("pipeline_start")
+        result = await pipeline.run(audio_input)
+        capture_task = asyncio.create_task(capture_turn(audio_input, samplerate, source, preroll))
+    else:
+        # Record real mic input
+        with timer.stage("record"):
+            audio = sd.rec(int(samplerate * duration), samplerate=samplerate, channels=1, dtype=np.int16)
+            sd.wait()
+
+        audio = audio.flatten()
+        if AUDIO_CONFIG["trim_silence"]:
+            with timer.stage("trim"):
+                audio, report = trim_silence(audio, samplerate)
+            print(f"✂️ Trimmed {report['removed_ms'] / 1000:.1f}s of silence")
 
+        audio_input = AudioInput(buffer=audio, frame_rate=samplerate)
 
+        timer.mark("pipeline_start")
+        result = await pipeline.run(audio_input)
+
+    # Play AI response; the player drains its ring buffer from the audio callback,
+    # so pulling the next TTS chunk never waits on the sound card.
+    player = AudioPlayer(sample_rate=samplerate)
+    player.start()
+
+    interrupted = None
+    try:
+        if barge_in:
+            # Listen for the user talking over the reply once this turn's capture is done.
+            interrupted = await play_interruptible(result, player, source, listen_after=capture_task, timer=timer)
+            if interrupted:
+                print(f"✋ Interrupted: reply silenced {interrupted['cancel_to_silence_ms']:.0f}ms after you spoke")
+        else:
+            async for event in result.stream():
+                if event.type == "voice_stream_event_audio":
+                    timer.mark("first_audio")
+                    await player.enqueue(event.data)
+            with timer.stage("playback_drain"):
+                await player.drain()
+        if record.transcript:
+            print(f"🗣️ You: {record.transcript}")
+            print(f"🤖 {record.agent}: {record.reply}")
+        if memory is not None:
+            usage = memory.stats()
+            print(
+                f"🧮 Context ~{usage['context_tokens']} tokens over {usage['turns']} turns"
+                + (f", last run {usage['input_tokens']} in ({usage['cached_tokens']} cached) / "
+                   f"{usage['output_tokens']} out" if "input_tokens" in usage else "")
+            )
+        breakdown = timer.finish()
+        if breakdown:
+            print("⏱️ " + ", ".join(f"{name} {ms:.0f}ms" for name, ms in sorted(breakdown.items())))
+    finally:
+        player.close()
+        if capture_task is not None and not capture_task.done():
+            capture_task.cancel()
+    reason = None
+    if capture_task is not None and capture_task.done() and not capture_task.cancelled():
+        reason = capture_task.result()
+    return reason, interrupted
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Talk to the voice agent from the terminal")
+    parser.add_argument(
+        "--agent",
+        choices=list(AGENTS),
+        default="Weather Agent",
+        help="agent to talk to",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["stream", "fixed"],
+        default="stream",
+        help="stream: end the turn when you stop talking; fixed: record a fixed-length block",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=4,
+        help="recording length in seconds for --mode fixed",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="time each turn's stages and write Prometheus text to this file",
+    )
+    parser.add_argument(
+        "--barge-in",
+        action="store_true",
+        default=AUDIO_CONFIG["barge_in"],
+        help="keep the conversation going and cut the reply off when you talk over it (stream mode)",
+    )
+    parser.add_argument(
+        "--input-wav",
+        help="feed this WAV in real time instead of the microphone (stream mode), e.g. to test barge-in",
+    )
+    subcommands = parser.add_subparsers(dest="command")
+    batch = subcommands.add_parser(
+        "batch",
+        help="run recorded WAV turns from a directory or manifest and save transcripts, replies and audio",
+    )
+    # SUPPRESS so `--agent` given before `batch` isn't reset to the default here.
+    batch.add_argument("--agent", choices=list(AGENTS), default=argparse.SUPPRESS, help="agent to run the turns with")
+    batch.add_argument("source", help="directory of .wav files, or a manifest (one path or JSON object per line)")
+    batch.add_argument("--out", required=True, help="output directory; finished turns are skipped on rerun")
+    batch.add_argument("--concurrency", type=int, default=BATCH_CONFIG["concurrency"], help="turns in flight at once")
+    batch.add_argument(
+        "--rate-limit",
+        type=float,
+        default=BATCH_CONFIG["rate_limit"],
+        help="max turns started per second (0 for no limit)",
+    )
+    batch.add_argument("--audio-format", choices=["wav", "mp3"], default=BATCH_CONFIG["audio_format"])
+    args = parser.parse_args()
+    if args.mode != "stream" and (args.barge_in or args.input_wav):
+        parser.error("--barge-in and --input-wav need --mode stream")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.metrics_file:
+        metrics.enable(export_file=args.metrics_file)
+    if args.command == "batch":
+        asyncio.run(main_batch(args.source, args.out, args.agent, args.concurrency, args.rate_limit, args.audio_format))
+    else:
+        asyncio.run(main(
+            mode=args.mode,
+            duration=args.duration,
+            agent_name=args.agent,
+            barge_in=args.barge_in,
+            input_wav=args.input_wav,
+        ))
@@ -17,7 +17,162 @@ AUDIO_CONFIG = {
     "dtype": "int16",
     "default_duration": 5,  # seconds
     "min_duration": 3,
-    "max_duration": 10
+    "max_duration": 10,
+    # Streaming capture / endpointing
+    "block_ms": 20,  # size of each microphone callback block
+    "speech_threshold_db": -45.0,  # minimum frame energy (dBFS) counted as speech
+    "noise_margin_db": 12.0,  # speech must also exceed the tracked noise floor by this much
+    "endpoint_silence_ms": 700,  # trailing silence that closes a turn
+    "min_speech_ms": 200,  # ignore blips shorter than this
+    "no_speech_timeout": 8,  # seconds to wait for the user to start talking
+    "max_turn_duration": 30,  # hard cap on a single streamed turn (seconds)
+    # Silence trimming before STT upload
+    "trim_silence": True,
+    "trim_frame_ms": 20,  # analysis frame for silence detection
+    "trim_threshold_db": -45.0,  # frames quieter than this (dBFS) are silence...
+    "trim_relative_db": 35.0,  # ...as are frames this far below the loudest frame
+    "trim_padding_ms": 150,  # silence kept around the speech so words aren't clipped
+    "max_pause_ms": None,  # shorten internal pauses longer than this (None = keep them)
+    # Playback
+    "output_sample_rate": 24000,  # rate of the PCM the TTS model returns
+    "playback_buffer_ms": 3000,  # ring buffer capacity for synthesized audio
+    "playback_preroll_ms": 150,  # audio to queue up before (re)starting output
+    "playback_block_ms": 20,  # size of each output callback block
+    # Barge-in (talking over the reply cuts it off)
+    "barge_in": False,  # cli.py --barge-in turns it on for a session
+    "barge_in_threshold_db": -35.0,  # louder than normal onset, so speaker bleed doesn't trigger it
+    "barge_in_min_speech_ms": 250,  # sustained speech needed before the reply is cancelled
+    "barge_in_preroll_ms": 300  # audio before the onset carried into the next turn
+}
+
+# Per-session reply audio store
+AUDIO_STORE_CONFIG = {
+    "max_bytes": 8 * 1024 * 1024,  # encoded audio kept in memory per session
+    "format": "wav",  # "wav", or "mp3" when pydub/ffmpeg are available
+    "spill_to_disk": False,  # move evicted clips to a temp dir instead of dropping them
+    "spill_dir": None  # defaults to a fresh temporary directory
+}
+
+# OpenAI connection Configuration
+OPENAI_CONFIG = {
+    "warm_up": True,  # open connections at startup, before the first turn
+    "warm_up_connections": 2,  # STT/LLM and TTS overlap within a turn
+    "max_connections": 50,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 120  # seconds an idle connection is kept open
+}
+
+# How reply text is cut into TTS requests
+TTS_SPLIT_CONFIG = {
+    "strategy": "adaptive",  # "adaptive" (short first chunk, then sentences) or "sentence" (SDK default)
+    "first_min_chars": 12,  # shortest first chunk; it ends at the first clause or sentence break after this
+    "first_max_chars": 60,  # force a first chunk at a space if no break shows up by here
+    "min_chars": 80,  # later chunks batch whole sentences up to at least this many characters
+    "max_chars": 300  # force a later chunk at a clause break or space beyond this
+}
+
+# Synthesized speech cache
+TTS_CACHE_CONFIG = {
+    "enabled": True,
+    "max_bytes": 32 * 1024 * 1024,  # PCM kept in memory across all sessions
+    "disk_dir": None,  # set to a directory to persist synthesized segments
+    "sample_rate": 24000,  # rate of the PCM the TTS model returns
+    "warm_up": False,  # synthesize warmup_phrases when connections are warmed up
+    "warmup_phrases": [
+        "City not found.",
+        "Sure, I'd be happy to help with that.",
+        "Is there anything else I can help you with?",
+        "¡Claro! Con mucho gusto te ayudo.",
+    ]
+}
+
+# Weather tool Configuration
+WEATHER_CONFIG = {
+    "base_url": "http://api.openweathermap.org/data/2.5",  # overridable with WEATHER_API_URL
+    "cache_ttl": 600,  # seconds a city's weather is reused
+    "cache_size": 256,  # cities kept before LRU eviction
+    "bulk_concurrency": 4,  # lookups in flight at once for one fetch_weather_bulk call
+    "stale_ttl": 3600  # seconds a report may be served as "last known" while the API is down
+}
+
+# Deadlines, hedged requests and circuit breaking for upstream tool calls (resilience.py)
+RESILIENCE_CONFIG = {
+    "deadline": 3.0,  # seconds a call may take, hedges included, before the fallback answer is used
+    "hedge_quantile": 0.95,  # send a duplicate request once the first has run this long (latency quantile)
+    "hedge_delay": 0.5,  # seconds before hedging while too few latencies are known
+    "min_hedge_delay": 0.05,
+    "max_hedges": 1,  # duplicate requests per call (0 turns hedging off)
+    "latency_window": 200,  # recent call latencies the quantile is taken over
+    "min_samples": 20,
+    "failure_threshold": 5,  # consecutive failures that open the circuit
+    "reset_timeout": 30.0  # seconds the circuit stays open before one probe call is let through
+}
+
+# Speculative weather lookups started from the transcript, ahead of the LLM's tool call (opt-in)
+SPECULATION_CONFIG = {
+    "enabled": False,  # True to prefetch; costs an OpenWeather request per weather-like question, even unused
+    "max_per_minute": 30,  # cap on speculative lookups per process
+    "window": 30  # seconds a prefetched result waits for the tool call before it counts as wasted
+}
+
+# Full-turn reply cache for repeated weather questions (opt-in)
+RESPONSE_CACHE_CONFIG = {
+    "enabled": False,  # replay a previous answer instead of calling the LLM
+    "maxsize": 512  # replies kept; each expires with the weather data it was built from
+}
+
+# Headless voice server (server.py)
+SERVER_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 8765,
+    "max_sessions": 100,  # connections beyond this are refused (close code 1013)
+    "max_inflight_turns": 8,  # STT/LLM/TTS turns running at once across all sessions
+    "admission_timeout": 5.0,  # seconds a turn may wait for a slot before it is rejected
+    "frame_queue_size": 250,  # inbound audio frames buffered per session before reads pause
+    "turn_queue_size": 2,  # finished utterances waiting for a reply per session
+    "barge_in": True  # cancel a session's reply when its client starts talking again
+}
+
+# Offline batch runs (cli.py batch)
+BATCH_CONFIG = {
+    "concurrency": 4,  # turns in flight at once
+    "rate_limit": 2.0,  # turns started per second at most (0 for no limit)
+    "audio_format": "wav"  # format of the saved reply audio ("wav" or "mp3")
+}
+
+# Per-turn latency instrumentation
+METRICS_CONFIG = {
+    "enabled": False,  # also switched on by VOICE_METRICS=1 or cli.py --metrics-file
+    "export_file": None,  # rewrite Prometheus text here after every turn
+    "buckets": [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]  # seconds
+}
+
+# Conversation log on disk (conversation_log.py), so Streamlit sessions survive restarts
+CONVERSATION_LOG_CONFIG = {
+    "enabled": True,
+    "dir": ".conversations",  # one subdirectory per session
+    "max_audio_bytes": 64 * 1024 * 1024,  # reply audio kept per session; older clips lose their audio on compaction
+    "retention_days": 7,  # sessions not written to for this long are deleted (0 keeps them forever)
+    "fsync": False  # fsync every record; safer against power loss, slower
+}
+
+# Conversation memory (context carried between turns)
+MEMORY_CONFIG = {
+    "enabled": True,
+    "budgets": {  # estimated tokens of history sent with each turn, by starting agent
+        "VoiceAssistant": 2000,
+        "SpanishAgent": 1500,
+        "UrduAgent": 1500
+    },
+    "default_budget": 1500,
+    "summary_tokens": 300,  # cap on the rolling summary of compacted turns
+    "compact_fraction": 0.5  # share of the oldest turns folded into the summary per compaction
+}
+
+# Pre-LLM language routing
+ROUTING_CONFIG = {
+    "enabled": True,  # dispatch non-English turns straight to the matching agent
+    "min_confidence": 0.85  # below this, leave it to the LLM handoff
 }
 
 # Agent Configuration
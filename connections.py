@@ -0,0 +1,134 @@
+"""
+Process-wide pooled HTTP and OpenAI clients
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+
+import httpx
+from agents.models.interface import ModelProvider
+from agents.models.openai_provider import OpenAIProvider
+from agents.voice import OpenAIVoiceModelProvider, VoiceModelProvider
+
+from config import OPENAI_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Connection settings for outbound tool calls (e.g. OpenWeather)
+HTTP_TIMEOUT = httpx.Timeout(connect=2.0, read=5.0, write=5.0, pool=2.0)
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+
+# Connection settings for the STT / LLM / TTS endpoints
+OPENAI_LIMITS = httpx.Limits(
+    max_connections=OPENAI_CONFIG["max_connections"],
+    max_keepalive_connections=OPENAI_CONFIG["max_keepalive_connections"],
+    keepalive_expiry=OPENAI_CONFIG["keepalive_expiry"],
+)
+
+# httpx pools are bound to the loop that opened them, so keep one set per loop.
+_loop_clients = weakref.WeakKeyDictionary()
+
+stats = {"clients_created": 0, "openai_requests": 0, "warm_ups": 0}
+
+
+def _clients_for_running_loop():
+    loop = asyncio.get_running_loop()
+    clients = _loop_clients.get(loop)
+    if clients is None:
+        clients = _loop_clients[loop] = {}
+    return clients
+
+
+def get_http_client():
+    """Return the shared keep-alive httpx client for the running event loop"""
+    clients = _clients_for_running_loop()
+    client = clients.get("http")
+    if client is None or client.is_closed:
+        client = clients["http"] = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    return client
+
+
+async def _count_request(request):
+    stats["openai_requests"] += 1
+
+
+def get_openai_client(api_key=None):
+    """Return the pooled AsyncOpenAI client for `api_key` on the running event loop.
+
+    With no key the client falls back to OPENAI_API_KEY; OPENAI_BASE_URL is
+    honoured as usual, which is how a local stub server can stand in for the API.
+    """
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    clients = _clients_for_running_loop()
+    key = ("openai", api_key)
+    client = clients.get(key)
+    if client is None or client.is_closed():
+        http_client = DefaultAsyncHttpxClient(
+            limits=OPENAI_LIMITS,
+            event_hooks={"request": [_count_request]},
+        )
+        client = clients[key] = AsyncOpenAI(api_key=api_key, http_client=http_client)
+        stats["clients_created"] += 1
+    return client
+
+
+async def warm_up(api_key=None, connections=OPENAI_CONFIG["warm_up_connections"]):
+    """Open pooled connections to the API before the first turn needs them.
+
+    Issues `connections` cheap concurrent requests so STT, LLM and TTS calls
+    that overlap within a turn all find an established TLS connection.
+    Failures are logged, never raised: warm-up is only an optimisation.
+    """
+    start = time.perf_counter()
+    try:
+        client = get_openai_client(api_key)
+    except Exception as e:
+        logger.warning("OpenAI warm-up skipped: %s", e)
+        return None
+    results = await asyncio.gather(
+        *(client.models.list() for _ in range(connections)), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("OpenAI warm-up request failed: %s", result)
+    stats["warm_ups"] += 1
+    return time.perf_counter() - start
+
+
+async def close_clients():
+    """Close every pooled client opened on the running event loop"""
+    clients = _loop_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        if isinstance(client, httpx.AsyncClient):
+            await client.aclose()
+        else:
+            await client.close()
+
+
+class PooledModelProvider(ModelProvider):
+    """LLM provider that resolves models against the pooled client for the running loop"""
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+
+    def get_model(self, model_name):
+        return OpenAIProvider(openai_client=get_openai_client(self.api_key)).get_model(model_name)
+
+
+class PooledVoiceModelProvider(VoiceModelProvider):
+    """STT/TTS provider that shares the pooled client with the LLM"""
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+
+    def _provider(self):
+        return OpenAIVoiceModelProvider(openai_client=get_openai_client(self.api_key))
+
+    def get_stt_model(self, model_name):
+        return self._provider().get_stt_model(model_name)
+
+    def get_tts_model(self, model_name):
+        return self._provider().get_tts_model(model_name)
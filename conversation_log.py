@@ -0,0 +1,305 @@
+"""
+Persistent per-session conversation log: append-only metadata plus a segment file of reply audio.
+
+Each session gets a directory under CONVERSATION_LOG_CONFIG["dir"] with
+
+    log.jsonl      one JSON record per line: messages, edits to them, clears
+    audio-N.seg    encoded reply clips back to back; messages point at (offset, length)
+
+Nothing is rewritten in place. The conversation is rebuilt by replaying the
+log, and clips are read back through a memory map, so a long conversation
+costs disk, not RAM. `compact()` rewrites both files with only the live
+messages and the newest clips within `max_audio_bytes`.
+
+Several tabs may resume the same session. Writers take an exclusive lock
+on `lock` in the session directory and first catch up with whatever the
+others appended or compacted, so no instance writes to a replaced segment.
+"""
+
+import json
+import mmap
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+
+from config import CONVERSATION_LOG_CONFIG
+
+try:
+    import fcntl
+except ImportError:  # Windows: no locking, so keep to one tab per session
+    fcntl = None
+
+SESSION_ID = re.compile(r"[0-9a-f]{32}")
+
+
+def valid_session_id(session_id):
+    """True for ids made by uuid4().hex; anything else never becomes a path"""
+    return isinstance(session_id, str) and SESSION_ID.fullmatch(session_id) is not None
+
+
+def prune_sessions(root=CONVERSATION_LOG_CONFIG["dir"], retention_days=CONVERSATION_LOG_CONFIG["retention_days"]):
+    """Delete sessions whose log hasn't been written for `retention_days`; return how many"""
+    if not retention_days or not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - retention_days * 86400
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        log_path = os.path.join(path, "log.jsonl")
+        if valid_session_id(name) and os.path.isdir(path):
+            modified = os.path.getmtime(log_path) if os.path.exists(log_path) else os.path.getmtime(path)
+            if modified < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+    return removed
+
+
+class ConversationLog:
+    """One session's messages and reply audio on disk.
+
+    Messages are dicts (type, text, agent, ...). `append()` gives each a
+    `seq`, and an `audio` reference when it carries a clip; `update()` and
+    `clear()` are appended as records of their own. Audio is written before
+    the record that points at it, and a torn last line is skipped on
+    replay, so a crash loses at most the message being written.
+    """
+
+    def __init__(self, session_id, root=CONVERSATION_LOG_CONFIG["dir"],
+                 max_audio_bytes=CONVERSATION_LOG_CONFIG["max_audio_bytes"], fsync=CONVERSATION_LOG_CONFIG["fsync"]):
+        if not valid_session_id(session_id):
+            raise ValueError(f"Invalid session id {session_id!r}")
+        self.session_id = session_id
+        self.dir = os.path.join(root, session_id)
+        self.max_audio_bytes = max_audio_bytes
+        self.fsync = fsync
+        self.compactions = 0
+        self._log_path = os.path.join(self.dir, "log.jsonl")
+        self._messages = {}
+        self._next_seq = 0
+        self._segment = "audio-0.seg"
+        self._map = None
+        self._map_name = None
+        self._log_id = None
+        self._log_offset = 0  # bytes of the log already replayed
+        os.makedirs(self.dir, exist_ok=True)
+        self._lock_file = open(os.path.join(self.dir, "lock"), "a")
+        with self._locked():
+            cleared = self._replay()
+            self._open_files()
+            if not os.path.getsize(self._log_path):
+                self._write({"op": "segment", "name": self._segment})
+            elif self._ends_torn():
+                # Start on a fresh line so the next record isn't glued to the torn one.
+                self._log_file.write("\n")
+                self._log_file.flush()
+            if cleared or self._segment_size() > self.max_audio_bytes:
+                self._compact()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the session's writer lock, caught up with the log as other instances left it"""
+        if fcntl is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            if self._log_id is not None:
+                self._sync()
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _sync(self):
+        stat = os.stat(self._log_path)
+        if (stat.st_dev, stat.st_ino) != self._log_id:
+            # Another instance compacted: its log and segment replace everything this one knew.
+            self._close_files()
+            self._messages = {}
+            self._next_seq = 0
+            self._log_offset = 0
+            self._replay()
+            self._open_files()
+        elif stat.st_size > self._log_offset:
+            self._replay()
+
+    def _replay(self):
+        """Apply log records past `_log_offset`; True if one is a clear worth compacting away"""
+        cleared = False
+        if not os.path.exists(self._log_path):
+            return cleared
+        with open(self._log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write at the end of the log
+                self._log_offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write, since followed by a newline
+                op = record.pop("op", None)
+                if op == "segment":
+                    self._segment = record["name"]
+                elif op == "message":
+                    self._messages[record["seq"]] = record
+                    self._next_seq = max(self._next_seq, record["seq"] + 1)
+                elif op == "update" and record.get("seq") in self._messages:
+                    self._messages[record["seq"]].update(record)
+                elif op == "clear":
+                    self._messages.clear()
+                    cleared = True
+        return cleared
+
+    def _ends_torn(self):
+        with open(self._log_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _open_files(self):
+        self._log_file = open(self._log_path, "a", encoding="utf-8")
+        self._segment_file = open(os.path.join(self.dir, self._segment), "ab")
+        stat = os.fstat(self._log_file.fileno())
+        self._log_id = (stat.st_dev, stat.st_ino)
+
+    def _segment_size(self):
+        return os.path.getsize(os.path.join(self.dir, self._segment))
+
+    def _write(self, record):
+        self._log_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log_file.flush()
+        if self.fsync:
+            os.fsync(self._log_file.fileno())
+        # Only called under the lock, caught up, so everything up to here has been replayed.
+        self._log_offset = self._log_file.tell()
+
+    def messages(self):
+        """The live messages, oldest first"""
+        with self._locked():
+            return [dict(message) for _, message in sorted(self._messages.items())]
+
+    def append(self, message, audio=None, mime=None):
+        """Persist a message (and its encoded audio clip); return it with `seq` and `audio` set"""
+        with self._locked():
+            message = dict(message, seq=self._next_seq)
+            self._next_seq += 1
+            if audio:
+                self._segment_file.seek(0, os.SEEK_END)
+                offset = self._segment_file.tell()
+                self._segment_file.write(audio)
+                self._segment_file.flush()
+                if self.fsync:
+                    os.fsync(self._segment_file.fileno())
+                message["audio"] = {"segment": self._segment, "offset": offset, "length": len(audio), "mime": mime}
+            self._write({"op": "message", **message})
+            self._messages[message["seq"]] = message
+            # Compact once the segment is well over budget, so the rewrite is paid rarely.
+            if audio and self._segment_size() > 1.5 * self.max_audio_bytes:
+                self._compact()
+                message = dict(self._messages[message["seq"]])
+            return message
+
+    def update(self, seq, **fields):
+        """Change fields of an earlier message (e.g. its text once the transcript arrives)"""
+        with self._locked():
+            if seq in self._messages:
+                self._write({"op": "update", "seq": seq, **fields})
+                self._messages[seq].update(fields)
+
+    def clear(self):
+        """Forget every message; the space is reclaimed by compaction"""
+        with self._locked():
+            self._write({"op": "clear"})
+            self._messages.clear()
+            self._compact()
+
+    def read_audio(self, ref):
+        """Bytes of the clip `ref` points at, read through a memory map, or None if it's gone"""
+        with self._locked():
+            return self._read_audio(ref)
+
+    def _read_audio(self, ref):
+        if not ref or ref.get("segment") != self._segment:
+            return None
+        end = ref["offset"] + ref["length"]
+        if self._map is None or self._map_name != self._segment or len(self._map) < end:
+            # The segment has grown (or was replaced) since it was mapped.
+            self._close_map()
+            if self._segment_size() < end:
+                return None
+            with open(os.path.join(self.dir, self._segment), "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._map_name = self._segment
+        return self._map[ref["offset"]:end]
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def compact(self):
+        """Rewrite the log with only live messages and the newest clips within `max_audio_bytes`"""
+        with self._locked():
+            self._compact()
+
+    def _compact(self):
+        keep_audio, budget = set(), self.max_audio_bytes
+        for seq, message in sorted(self._messages.items(), reverse=True):
+            ref = message.get("audio")
+            if ref and ref["segment"] == self._segment and ref["length"] <= budget:
+                keep_audio.add(seq)
+                budget -= ref["length"]
+
+        old_segment = self._segment
+        generation = int(re.search(r"\d+", old_segment).group()) + 1
+        new_segment = f"audio-{generation}.seg"
+        new_messages = {}
+        offset = 0
+        with open(os.path.join(self.dir, new_segment), "wb") as segment:
+            for seq, message in sorted(self._messages.items()):
+                message = dict(message)
+                ref = message.pop("audio", None)
+                if seq in keep_audio:
+                    clip = self._read_audio(ref)
+                    if clip is not None:
+                        segment.write(clip)
+                        message["audio"] = dict(ref, segment=new_segment, offset=offset)
+                        offset += len(clip)
+                new_messages[seq] = message
+            segment.flush()
+            os.fsync(segment.fileno())
+
+        tmp = self._log_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "segment", "name": new_segment}) + "\n")
+            for message in new_messages.values():
+                f.write(json.dumps({"op": "message", **message}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        # The new log only takes effect here; until then the old log and segment are intact.
+        self._close_files()
+        os.replace(tmp, self._log_path)
+        os.remove(os.path.join(self.dir, old_segment))
+        self._segment = new_segment
+        self._messages = new_messages
+        self._open_files()
+        self._log_offset = self._log_file.tell()
+        self.compactions += 1
+
+    def _close_files(self):
+        self._close_map()
+        self._log_file.close()
+        self._segment_file.close()
+
+    def close(self):
+        self._close_files()
+        self._lock_file.close()
+
+    def stats(self):
+        with self._locked():
+            return {
+                "messages": len(self._messages),
+                "log_bytes": os.path.getsize(self._log_path),
+                "audio_bytes": self._segment_size(),
+                "compactions": self.compactions,
+            }
@@ -0,0 +1,39 @@
+"""
+Local intent matching on transcripts, used ahead of the LLM
+"""
+
+import re
+
+# Cities are taken as the run of capitalized words the STT output gives proper nouns.
+CITY = r"[A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)*"
+# "weather ... in/for <City>" (English) and "tiempo/clima ... en <Ciudad>" (Spanish).
+WEATHER_CITY = re.compile(r"(?i:weather|tiempo|clima)\b.*?\b(?i:in|en|for)\s+(" + CITY + ")")
+# Further cities in a list: "..., <City>", "... and <City>", "..., y <Ciudad>"
+MORE_CITIES = re.compile(r"(?:\s*,\s*(?:(?i:and|y)\s+)?|\s+(?i:and|y|&)\s+)(" + CITY + ")")
+
+
+def weather_cities(text):
+    """Cities named in a weather question ("weather in Lahore, Karachi and Madrid"), in order"""
+    match = WEATHER_CITY.search(text)
+    if match is None:
+        return []
+    cities = [match.group(1).strip()]
+    more = MORE_CITIES.match(text, match.end())
+    while more is not None:
+        cities.append(more.group(1).strip())
+        more = MORE_CITIES.match(text, more.end())
+    return cities
+
+
+def weather_city(text):
+    """City named in a weather question, or None (also when it names several)"""
+    cities = weather_cities(text)
+    return cities[0] if len(cities) == 1 else None
+
+
+def parse_intent(text):
+    """Return (intent, tool_args) for a transcript the assistant can answer from a tool, else None"""
+    city = weather_city(text)
+    if city is not None:
+        return "weather", {"city": city}
+    return None
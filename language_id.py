@@ -0,0 +1,92 @@
+"""
+Cheap local language identification for routing transcripts (English / Spanish / Urdu)
+"""
+
+import re
+
+# Common words, weighted by how strongly they indicate the language
+STOPWORDS = {
+    "en": {
+        "the", "is", "and", "what", "how", "you", "are", "in", "of", "to", "it",
+        "weather", "please", "can", "i", "me", "my", "today", "tell", "hello", "thanks",
+    },
+    "es": {
+        "el", "la", "los", "las", "de", "que", "es", "en", "y", "por", "para", "qué",
+        "cómo", "hola", "gracias", "tiempo", "clima", "hace", "hoy", "está", "un", "una",
+        "me", "puedes", "dime", "favor", "buenos", "días", "cuál",
+    },
+}
+
+# Frequent character trigrams (word boundaries padded with spaces)
+TRIGRAMS = {
+    "en": {
+        " th", "the", "he ", "ing", "ng ", " an", "and", "nd ", " to", "to ", " is", "is ",
+        "at ", " wh", "wha", "hat", " yo", "you", "ou ", "er ", "ed ", " it", "wea", "ath",
+    },
+    "es": {
+        " de", "de ", " la", "la ", "que", " qu", "ue ", " el", "el ", "os ", "as ", "ció",
+        "ión", " es", "es ", " en", "en ", "ar ", "ado", "ien", "est", "mpo", "ola", " ho",
+    },
+}
+
+SPANISH_MARKERS = set("ñ¿¡áéíóú")
+# Letters used in Urdu but not in Arabic
+URDU_LETTERS = set("ٹڈڑںےھہۓگچپژ")
+STT_LANGUAGE_NAMES = {"english": "en", "spanish": "es", "urdu": "ur"}
+
+_WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+# Arabic, Arabic Supplement and Arabic Presentation Forms blocks
+ARABIC_RANGES = ((0x0600, 0x06FF), (0x0750, 0x077F), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF))
+
+
+def _is_arabic_script(ch):
+    code = ord(ch)
+    return any(lo <= code <= hi for lo, hi in ARABIC_RANGES)
+
+
+def detect_language(text, hint=None):
+    """Return (language, confidence) for a transcript.
+
+    `language` is "en", "es", "ur" or None when there is too little evidence.
+    `hint` is optional language metadata from the STT provider (an ISO code
+    or a name such as "spanish"); it nudges the decision rather than
+    overriding it.
+    """
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return None, 0.0
+
+    # Script first: Arabic-script text is Urdu for this assistant.
+    arabic = sum(1 for ch in letters if _is_arabic_script(ch))
+    if arabic / len(letters) > 0.5:
+        confidence = arabic / len(letters)
+        if any(ch in URDU_LETTERS for ch in letters):
+            confidence = min(1.0, confidence + 0.1)
+        return "ur", round(confidence, 3)
+
+    lowered = text.casefold()
+    words = _WORD.findall(lowered)
+    padded = " " + " ".join(words) + " "
+    grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    scores = {}
+    for lang in ("en", "es"):
+        scores[lang] = 2.0 * sum(1 for w in words if w in STOPWORDS[lang])
+        scores[lang] += sum(1 for g in grams if g in TRIGRAMS[lang])
+    scores["es"] += 3.0 * sum(1 for ch in lowered if ch in SPANISH_MARKERS)
+
+    if hint:
+        hinted = STT_LANGUAGE_NAMES.get(str(hint).lower(), str(hint).lower()[:2])
+        if hinted in scores:
+            scores[hinted] += 0.5 * (scores["en"] + scores["es"] + 2.0)
+        elif hinted == "ur":
+            return "ur", 0.8
+
+    total = scores["en"] + scores["es"]
+    if total < 4.0:
+        return None, 0.0
+    lang = max(scores, key=scores.get)
+    return lang, round(scores[lang] / total, 3)
+
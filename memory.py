@@ -0,0 +1,113 @@
+"""
+Per-conversation memory with a token budget and a rolling summary of older turns
+"""
+
+from config import MEMORY_CONFIG
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), good enough for budgeting"""
+    return max(1, len(text) // 4)
+
+
+def _first_sentence(text, limit=160):
+    text = " ".join(text.split())
+    for end in (". ", "? ", "! ", "。", "۔"):
+        cut = text.find(end)
+        if 0 < cut < limit:
+            return text[:cut + 1].strip()
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+class ConversationMemory:
+    """Recent turns kept verbatim, older ones folded into a short summary.
+
+    `build_input()` returns the input list for the next run:
+
+        [summary message (if any), user, assistant, user, assistant, ..., new user]
+
+    Everything before the new message only changes when a turn is added or
+    when compaction runs. Compaction folds a whole batch of the oldest turns
+    (`compact_fraction` of them) into the summary at once rather than one
+    turn per request, so the summary and the turns after it stay
+    byte-identical across most consecutive requests and the provider's
+    prompt cache keeps hitting. The agent's instructions and tools, which
+    come first, never change.
+    """
+
+    def __init__(self, budgets=MEMORY_CONFIG["budgets"], default_budget=MEMORY_CONFIG["default_budget"],
+                 summary_tokens=MEMORY_CONFIG["summary_tokens"], compact_fraction=MEMORY_CONFIG["compact_fraction"]):
+        self.budgets = budgets
+        self.default_budget = default_budget
+        self.summary_tokens = summary_tokens
+        self.compact_fraction = compact_fraction
+        self.turns = []  # (user_text, assistant_text, tokens)
+        self.summary_lines = []
+        self.compactions = 0
+        self.turns_dropped = 0
+        self.last_usage = {}
+
+    def budget_for(self, agent_name):
+        return self.budgets.get(agent_name, self.default_budget)
+
+    def _summary_text(self):
+        return "Summary of the earlier conversation:\n" + "\n".join(self.summary_lines)
+
+    def context_tokens(self):
+        """Estimated tokens of the remembered context (without the next message)"""
+        total = sum(tokens for _, _, tokens in self.turns)
+        if self.summary_lines:
+            total += estimate_tokens(self._summary_text())
+        return total
+
+    def _compact(self):
+        """Fold the oldest batch of turns into the summary, trimming the summary to its budget"""
+        count = max(1, int(len(self.turns) * self.compact_fraction))
+        for user_text, assistant_text, _ in self.turns[:count]:
+            self.summary_lines.append(f"- User: {_first_sentence(user_text)} Assistant: {_first_sentence(assistant_text)}")
+        del self.turns[:count]
+        # Lines beyond the summary budget are dropped, oldest first.
+        while len(self.summary_lines) > 1 and estimate_tokens(self._summary_text()) > self.summary_tokens:
+            self.summary_lines.pop(0)
+            self.turns_dropped += 1
+        self.compactions += 1
+
+    def build_input(self, user_text, agent_name):
+        """Input items for the next run of `agent_name`, compacting first if over budget"""
+        budget = self.budget_for(agent_name)
+        while self.turns and self.context_tokens() + estimate_tokens(user_text) > budget:
+            self._compact()
+        items = []
+        if self.summary_lines:
+            items.append({"role": "system", "content": self._summary_text()})
+        for past_user, past_assistant, _ in self.turns:
+            items.append({"role": "user", "content": past_user})
+            items.append({"role": "assistant", "content": past_assistant})
+        items.append({"role": "user", "content": user_text})
+        return items
+
+    def add_turn(self, user_text, assistant_text, usage=None):
+        """Remember a finished turn; `usage` is the run's token usage, if known"""
+        self.turns.append((user_text, assistant_text, estimate_tokens(user_text) + estimate_tokens(assistant_text)))
+        self.last_usage = {}
+        if usage is not None:
+            self.last_usage = {
+                "input_tokens": usage.input_tokens,
+                "output_tokens": usage.output_tokens,
+                "cached_tokens": getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0) or 0,
+            }
+
+    def clear(self):
+        self.turns = []
+        self.summary_lines = []
+        self.last_usage = {}
+
+    def stats(self):
+        return {
+            "turns": len(self.turns),
+            "summary_lines": len(self.summary_lines),
+            "context_tokens": self.context_tokens(),
+            "compactions": self.compactions,
+            "turns_dropped": self.turns_dropped,
+            **self.last_usage,
+        }
@@ -0,0 +1,227 @@
+"""
+Per-turn stage timing with Prometheus-style histograms.
+
+A turn is timed by a TurnTimer made current with `activate()`; code along the
+path (workflow, tools, playback) calls `mark()` / `stage()` without needing a
+handle. When metrics are disabled `new_turn()` returns a no-op timer and the
+module-level helpers cost one context-variable lookup.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from config import METRICS_CONFIG
+
+_enabled = METRICS_CONFIG["enabled"] or os.getenv("VOICE_METRICS") == "1"
+_export_file = METRICS_CONFIG["export_file"]
+_current = ContextVar("voice_turn_timer", default=None)
+_NULL_STAGE = nullcontext()
+
+# Derived spans: (name, from mark, to mark)
+SPANS = (
+    ("stt", "pipeline_start", "transcribed"),
+    ("llm_first_token", "transcribed", "llm_first_token"),
+    ("handoff_to_first_token", "handoff", "llm_first_token"),
+    ("tts_first_audio", "llm_first_token", "first_audio"),
+    ("time_to_first_audio", "pipeline_start", "first_audio"),
+    ("llm_total", "transcribed", "llm_done"),
+    ("turn_total", "pipeline_start", "end"),
+)
+
+
+def summarize(values):
+    """Mean and p50/p95/p99 of a list of numbers (nearest-rank percentiles)"""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pct(p):
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+        "max": ordered[-1],
+    }
+
+
+def enable(enabled=True, export_file=None):
+    """Switch instrumentation on or off at runtime"""
+    global _enabled, _export_file
+    _enabled = enabled
+    if export_file is not None:
+        _export_file = export_file
+
+
+def is_enabled():
+    return _enabled
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds, keyed by stage"""
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            series = self._series.get(stage)
+            if series is None:
+                series = self._series[stage] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += seconds
+            series["count"] += 1
+
+    def render(self, name, help_text):
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        with self._lock:
+            for stage in sorted(self._series):
+                series = self._series[stage]
+                for bound, count in zip(self.buckets, series["counts"]):
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {count}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {series["count"]}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {series["sum"]:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {series["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram(METRICS_CONFIG["buckets"])
+
+# (tool, decision) -> count, e.g. ("weather", "hedged"); see resilience.ResilientCall
+DECISIONS = {}
+_decisions_lock = threading.Lock()
+
+
+class TurnTimer:
+    """Monotonic timestamps and stage durations for one voice turn"""
+
+    def __init__(self):
+        self.marks = {}
+        self.durations = {}
+
+    def mark(self, name):
+        """Record the first time `name` happens in this turn"""
+        if name not in self.marks:
+            self.marks[name] = time.monotonic()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block; repeated stages in one turn add up"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.monotonic() - start
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def breakdown(self):
+        """Stage durations in milliseconds, measured and derived"""
+        result = {name: 1000 * seconds for name, seconds in self.durations.items()}
+        for name, start, end in SPANS:
+            if start in self.marks and end in self.marks:
+                result[name] = 1000 * (self.marks[end] - self.marks[start])
+        return result
+
+    def finish(self):
+        """Close the turn and feed its stages into the histograms"""
+        self.mark("end")
+        for name, ms in self.breakdown().items():
+            STAGE_SECONDS.observe(name, ms / 1000)
+        if _export_file:
+            write_prometheus(_export_file)
+        return self.breakdown()
+
+
+class _NullTimer:
+    """Stand-in used while metrics are disabled"""
+
+    marks = {}
+    durations = {}
+
+    def mark(self, name):
+        pass
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+    def add(self, name, seconds):
+        pass
+
+    def breakdown(self):
+        return {}
+
+    def finish(self):
+        return {}
+
+
+NULL_TIMER = _NullTimer()
+
+
+def new_turn():
+    """A fresh TurnTimer, or the no-op timer when metrics are disabled"""
+    return TurnTimer() if _enabled else NULL_TIMER
+
+
+def activate(timer):
+    """Make `timer` current for this context (and tasks it creates)"""
+    if timer is not NULL_TIMER:
+        _current.set(timer)
+
+
+def current():
+    return _current.get() or NULL_TIMER
+
+
+def mark(name):
+    timer = _current.get()
+    if timer is not None:
+        timer.mark(name)
+
+
+def stage(name):
+    timer = _current.get()
+    if timer is None:
+        return _NULL_STAGE
+    return timer.stage(name)
+
+
+def count(tool, decision):
+    """Count one resilience decision (hedged, deadline_exceeded, ...) for a tool's upstream"""
+    if _enabled:
+        with _decisions_lock:
+            DECISIONS[(tool, decision)] = DECISIONS.get((tool, decision), 0) + 1
+
+
+def render_prometheus():
+    """All stage histograms and decision counters in Prometheus text exposition format"""
+    text = STAGE_SECONDS.render("voice_turn_stage_seconds", "Duration of each voice turn stage.")
+    with _decisions_lock:
+        if DECISIONS:
+            name = "voice_tool_call_decisions_total"
+            lines = [f"# HELP {name} Deadline, hedging and circuit breaker decisions per tool upstream.",
+                     f"# TYPE {name} counter"]
+            for (tool, decision), value in sorted(DECISIONS.items()):
+                lines.append(f'{name}{{tool="{tool}",decision="{decision}"}} {value}')
+            text += "\n".join(lines) + "\n"
+    return text
+
+
+def write_prometheus(path):
+    """Write the exposition text atomically, e.g. for node_exporter's textfile collector"""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
@@ -0,0 +1,194 @@
+"""
+Non-blocking, jitter-buffered audio playback for the CLI
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from config import AUDIO_CONFIG
+
+
+class AudioPlayer:
+    """Play int16 audio from a preallocated ring buffer drained by a sounddevice callback.
+
+    Producers call `await enqueue(chunk)` from the event loop; it only waits when
+    the ring buffer is full, so network receive and audio output never block
+    each other. Output starts once `preroll_ms` of audio is buffered and, after
+    an underrun, waits for the same jitter target again before resuming.
+    """
+
+    def __init__(
+        self,
+        sample_rate=AUDIO_CONFIG["sample_rate"],
+        buffer_ms=AUDIO_CONFIG["playback_buffer_ms"],
+        preroll_ms=AUDIO_CONFIG["playback_preroll_ms"],
+        block_ms=AUDIO_CONFIG["playback_block_ms"],
+    ):
+        self.sample_rate = sample_rate
+        self.block_size = int(sample_rate * block_ms / 1000)
+        self.preroll = int(sample_rate * preroll_ms / 1000)
+        capacity = max(int(sample_rate * buffer_ms / 1000), self.preroll + self.block_size)
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        self._read = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self._priming = True
+        self._ending = False
+        self._loop = None
+        self._space = None
+        self._empty = None
+        self._flushed = None
+        self._flush_pending = False
+        self._stream = None
+
+        self.underruns = 0
+        self.frames_played = 0
+        self.frames_dropped = 0
+        self.max_fill = 0
+
+    @property
+    def capacity(self):
+        return len(self._buffer)
+
+    @property
+    def output_latency(self):
+        """Seconds between the callback writing a block and it leaving the speaker"""
+        return self._stream.latency if self._stream is not None else 0.0
+
+    @property
+    def buffered(self):
+        """Samples currently waiting to be played"""
+        return self._size
+
+    def start(self):
+        """Open the output stream; must be called from the event loop thread"""
+        import sounddevice as sd
+
+        self._loop = asyncio.get_running_loop()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._empty = asyncio.Event()
+        self._empty.set()
+        self._flushed = self._loop.create_future()
+        self._stream = sd.OutputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype=np.int16,
+            blocksize=self.block_size,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    async def enqueue(self, data):
+        """Queue audio for playback, waiting only while the ring buffer is full"""
+        data = np.asarray(data)
+        if data.dtype != np.int16:
+            data = np.clip(data * 32767, -32768, 32767).astype(np.int16)
+        data = data.reshape(-1)
+        self._ending = False
+        offset = 0
+        while offset < len(data):
+            with self._lock:
+                written = self._write_locked(data[offset:])
+                if self._size >= self.capacity:
+                    self._space.clear()
+            offset += written
+            if written:
+                self._empty.clear()
+            if offset < len(data):
+                await self._space.wait()
+
+    async def drain(self):
+        """Play out whatever is buffered (even below the pre-roll) and wait for silence"""
+        with self._lock:
+            self._ending = True
+            if self._size == 0:
+                self._empty.set()
+        await self._empty.wait()
+
+    def flush(self):
+        """Drop all buffered audio immediately"""
+        with self._lock:
+            self.frames_dropped += self._size
+            self._read = 0
+            self._size = 0
+            self._priming = True
+            self._flush_pending = True
+            if self._flushed.done():
+                self._flushed = self._loop.create_future()
+        self._space.set()
+        self._empty.set()
+
+    async def wait_flushed(self, timeout=1.0):
+        """perf_counter time at which the callback first wrote silence after the last flush()"""
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._flushed), timeout)
+        except asyncio.TimeoutError:
+            return time.perf_counter()
+
+    def stats(self):
+        return {
+            "underruns": self.underruns,
+            "frames_played": self.frames_played,
+            "frames_dropped": self.frames_dropped,
+            "buffered_ms": 1000 * self._size / self.sample_rate,
+            "max_fill_ms": 1000 * self.max_fill / self.sample_rate,
+        }
+
+    def _write_locked(self, data):
+        free = self.capacity - self._size
+        n = min(free, len(data))
+        if n == 0:
+            return 0
+        start = (self._read + self._size) % self.capacity
+        first = min(n, self.capacity - start)
+        self._buffer[start:start + first] = data[:first]
+        if n > first:
+            self._buffer[:n - first] = data[first:n]
+        self._size += n
+        self.max_fill = max(self.max_fill, self._size)
+        return n
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        with self._lock:
+            if self._flush_pending:
+                self._flush_pending = False
+                self._loop.call_soon_threadsafe(self._on_flushed, self._flushed, time.perf_counter())
+            if self._priming and self._size < self.preroll and not self._ending:
+                out[:] = 0
+                return
+            self._priming = False
+            n = min(frames, self._size)
+            first = min(n, self.capacity - self._read)
+            out[:first] = self._buffer[self._read:self._read + first]
+            if n > first:
+                out[first:n] = self._buffer[:n - first]
+            out[n:] = 0
+            self._read = (self._read + n) % self.capacity
+            self._size -= n
+            self.frames_played += n
+            if n < frames and not self._ending:
+                # Ran dry mid-stream: count it and rebuffer up to the jitter target.
+                self.underruns += 1
+                self._priming = True
+            empty = self._size == 0
+        self._loop.call_soon_threadsafe(self._on_consumed, empty)
+
+    def _on_flushed(self, future, when):
+        if not future.done():
+            future.set_result(when)
+
+    def _on_consumed(self, empty):
+        self._space.set()
+        if empty and self._ending:
+            self._empty.set()
@@ -0,0 +1,36 @@
+"""
+Registry of agents and reusable voice pipelines
+"""
+
+from functools import lru_cache
+
+from agents_setup import agent, language_agents, spanish_agent, urdu_agent
+from config import ROUTING_CONFIG
+from workflow import build_pipeline
+
+# Keyed by the display names used in config.AGENTS
+AGENT_REGISTRY = {
+    "Weather Agent": agent,
+    "Spanish Agent": spanish_agent,
+    "Urdu Agent": urdu_agent,
+}
+
+
+def get_agent(agent_name):
+    """Return the agent registered under a display name"""
+    return AGENT_REGISTRY[agent_name]
+
+
+@lru_cache(maxsize=64)
+def get_pipeline(agent_name, api_key=None):
+    """Return the shared VoicePipeline for an agent and API key.
+
+    Pipelines are built once and reused for every turn. The workflow keeps no
+    per-turn state and the API key travels with the pipeline's providers, so
+    nothing touches os.environ. A pipeline resolves its STT/TTS models on
+    first use, so reuse it from a single long-lived event loop.
+    """
+    selected = get_agent(agent_name)
+    # Only the general assistant routes by language; the others were picked explicitly.
+    routes = language_agents if ROUTING_CONFIG["enabled"] and selected is agent else None
+    return build_pipeline(selected, api_key, language_routes=routes)
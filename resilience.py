@@ -0,0 +1,173 @@
+"""
+Tail-latency protection for upstream tool calls: deadlines, hedged requests and a circuit breaker
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+
+import metrics
+from config import RESILIENCE_CONFIG
+
+
+class CircuitOpenError(Exception):
+    """Raised (or handed to the fallback) when a call is refused because the circuit is open"""
+
+
+class CircuitBreaker:
+    """Fail fast after `failure_threshold` consecutive failures.
+
+    Once open, calls are refused for `reset_timeout` seconds; then a single
+    probe call is let through (half-open) and its outcome closes the circuit
+    again or re-opens it for another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold=RESILIENCE_CONFIG["failure_threshold"],
+                 reset_timeout=RESILIENCE_CONFIG["reset_timeout"], clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+
+    def allow(self):
+        if self.state == "open" and self._clock() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            return True
+        return self.state == "closed"
+
+    def record_success(self):
+        self.failures = 0
+        self.state = "closed"
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opens += 1
+            self.state = "open"
+            self.opened_at = self._clock()
+
+
+class ResilientCall:
+    """Run calls to one upstream under a deadline, with hedging and a circuit breaker.
+
+    `call(attempt)` runs the coroutine function `attempt`. If it hasn't
+    finished after `hedge_delay()` (the `hedge_quantile` of recent
+    latencies), a duplicate is started and whichever finishes first wins;
+    the other is cancelled. The whole call, hedges included, gets `deadline`
+    seconds. Timeouts and errors count against the circuit breaker, and while
+    the circuit is open calls are refused without touching the upstream.
+    Any of these failures is handed to `fallback(error)` when one is given,
+    so the caller can answer from a cache or with a graceful message.
+
+    Each decision is counted in `stats()` and, with metrics on, exported as
+    voice_tool_call_decisions_total{tool=name}.
+    """
+
+    def __init__(self, name, deadline=RESILIENCE_CONFIG["deadline"],
+                 hedge_quantile=RESILIENCE_CONFIG["hedge_quantile"], hedge_delay=RESILIENCE_CONFIG["hedge_delay"],
+                 min_hedge_delay=RESILIENCE_CONFIG["min_hedge_delay"], max_hedges=RESILIENCE_CONFIG["max_hedges"],
+                 latency_window=RESILIENCE_CONFIG["latency_window"], min_samples=RESILIENCE_CONFIG["min_samples"],
+                 breaker=None):
+        self.name = name
+        self.deadline = deadline
+        self.hedge_quantile = hedge_quantile
+        self.default_hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedges = max_hedges
+        self.min_samples = min_samples
+        self.latencies = deque(maxlen=latency_window)
+        self.breaker = breaker or CircuitBreaker()
+        self.decisions = Counter()
+
+    def _count(self, decision):
+        self.decisions[decision] += 1
+        metrics.count(self.name, decision)
+
+    def hedge_delay(self):
+        """Seconds to wait on an attempt before sending a duplicate"""
+        if len(self.latencies) < self.min_samples:
+            delay = self.default_hedge_delay
+        else:
+            ordered = sorted(self.latencies)
+            delay = ordered[min(len(ordered) - 1, int(self.hedge_quantile * len(ordered)))]
+        return max(self.min_hedge_delay, min(delay, self.deadline / 2))
+
+    async def call(self, attempt, fallback=None):
+        """Return `await attempt()`, or `fallback(error)` if it fails, times out or is refused"""
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            return self._fail(CircuitOpenError(f"{self.name} circuit is open"), fallback)
+        try:
+            result = await asyncio.wait_for(self._hedged(attempt), self.deadline)
+        except asyncio.TimeoutError as e:
+            # The slow calls were cancelled; count the deadline as their latency so the quantile sees them.
+            self.latencies.append(self.deadline)
+            self._count("deadline_exceeded")
+            self._record_failure()
+            return self._fail(e, fallback)
+        except Exception as e:
+            self._count("failed")
+            self._record_failure()
+            return self._fail(e, fallback)
+        self.breaker.record_success()
+        self._count("ok")
+        return result
+
+    def _record_failure(self):
+        was_open = self.breaker.state == "open"
+        self.breaker.record_failure()
+        if self.breaker.state == "open" and not was_open:
+            self._count("circuit_opened")
+
+    def _fail(self, error, fallback):
+        if fallback is None:
+            raise error
+        self._count("fallback")
+        return fallback(error)
+
+    async def _timed(self, attempt):
+        start = time.monotonic()
+        result = await attempt()
+        self.latencies.append(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, attempt):
+        tasks = [asyncio.ensure_future(self._timed(attempt))]
+        pending = set(tasks)
+        delay = self.hedge_delay()
+        error = None
+        try:
+            while pending:
+                timeout = delay if len(tasks) <= self.max_hedges else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self._count("hedged")
+                    hedge = asyncio.ensure_future(self._timed(attempt))
+                    tasks.append(hedge)
+                    pending.add(hedge)
+                    continue
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self._count("hedge_won")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # retrieved, so a losing attempt's error isn't logged as unhandled
+
+    def stats(self):
+        return {
+            **self.decisions,
+            "circuit": self.breaker.state,
+            "circuit_opens": self.breaker.opens,
+            "hedge_delay_ms": 1000 * self.hedge_delay(),
+        }
@@ -0,0 +1,107 @@
+"""
+Opt-in cache of whole assistant replies for repeated weather questions
+"""
+
+import json
+
+from agents.items import ToolCallItem
+
+from cache import TTLCache
+from config import RESPONSE_CACHE_CONFIG, WEATHER_CONFIG
+from intent import parse_intent
+from language_id import detect_language
+from tools import normalize_city, weather_cache
+
+
+def tool_calls(items, name):
+    """Parsed arguments of every call to tool `name` among a run's new items"""
+    calls = []
+    for item in items:
+        if isinstance(item, ToolCallItem) and getattr(item.raw_item, "name", None) == name:
+            try:
+                calls.append(json.loads(item.raw_item.arguments or "{}"))
+            except ValueError:
+                calls.append({})
+    return calls
+
+
+class ResponseCache:
+    """Replies keyed by (agent, language, intent, tool arguments).
+
+    An entry is only stored when the turn really called the tool with the
+    arguments the key was built from, and it lives exactly as long as the
+    `fetch_weather` result behind it: clearing or expiring the weather cache
+    entry for a city invalidates every reply built from it.
+
+    The reply is kept as the text chunks the LLM streamed, so replaying them
+    splits into the same TTS segments and the audio comes from the TTS cache.
+    """
+
+    def __init__(self, maxsize=RESPONSE_CACHE_CONFIG["maxsize"], ttl=WEATHER_CONFIG["cache_ttl"]):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key_for(agent_name, transcript):
+        """Return (key, city) for a cacheable transcript, or (None, None)"""
+        parsed = parse_intent(transcript)
+        if parsed is None:
+            return None, None
+        intent, args = parsed
+        language, _ = detect_language(transcript)
+        city = normalize_city(args["city"])
+        return (agent_name, language, intent, city), city
+
+    def get(self, key):
+        entry = self._entries.get(key, _count=False)
+        if entry is not None:
+            chunks, city = entry
+            if city in weather_cache:
+                self.hits += 1
+                return chunks
+            # The weather data it was built from is gone or stale.
+            self._entries.pop(key)
+        self.misses += 1
+        return None
+
+    def put(self, key, chunks, city, items):
+        """Store a finished reply if the run called fetch_weather for `city`"""
+        called = [normalize_city(str(args.get("city", ""))) for args in tool_calls(items, "fetch_weather")]
+        if called != [city]:
+            return False
+        ttl = weather_cache.ttl_remaining(city)
+        if ttl is None:
+            return False
+        self._entries.set(key, (tuple(chunks), city), ttl=ttl)
+        self.stores += 1
+        return True
+
+    def invalidate(self, city=None):
+        """Drop cached replies for one city, or all of them"""
+        if city is None:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            return
+        city = normalize_city(city)
+        for key in self._entries.keys():
+            if key[3] == city:
+                self._entries.pop(key)
+                self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self._entries.evictions,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,307 @@
+"""
+Headless multi-session voice server.
+
+Clients connect over WebSocket (optionally `?agent=Spanish%20Agent`), stream
+mono int16 PCM at AUDIO_CONFIG["sample_rate"] as binary messages, and get the
+reply back as binary int16 PCM plus JSON events:
+
+    {"type": "ready", "session": ...}        after the connection is admitted
+    {"type": "turn_started"} / {"type": "turn_ended", "ttfa_ms": ..., "total_ms": ...,
+                                 "transcript": ..., "reply": ..., "agent": ..., "tokens": {...}}
+    {"type": "busy", "message": ...}         turn or session rejected by admission control
+    {"type": "barge_in", "cancel_ms": ...}   the client talked over the reply; it was cut off,
+                                             and the client should drop any reply audio it buffered
+    {"type": "error", "message": ...}
+
+Text messages {"type": "end_turn"} (close the current utterance now) and
+{"type": "stats"} are accepted from the client.
+
+    python server.py --port 8765
+    python server.py --stub-models   # local fake STT/LLM/TTS + stub weather, for load tests
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from agents.voice import AudioInput
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+from audio_capture import EnergyEndpointer
+from config import AUDIO_CONFIG, MEMORY_CONFIG, SERVER_CONFIG
+from memory import ConversationMemory
+from registry import AGENT_REGISTRY, get_pipeline
+from workflow import cancel_result, record_turn
+
+logger = logging.getLogger(__name__)
+
+_END_TURN = object()
+
+
+class VoiceServer:
+    """Host many concurrent voice sessions in one process.
+
+    Each session has a bounded inbound frame queue, so a client that sends
+    faster than its turns are processed stops being read (and TCP pushes back).
+    A global semaphore caps turns in flight across sessions; a turn that cannot
+    get a slot within `admission_timeout` is answered with "busy".
+    """
+
+    def __init__(self, pipeline_for=get_pipeline, config=SERVER_CONFIG):
+        self.pipeline_for = pipeline_for
+        self.config = config
+        self.inflight = asyncio.Semaphore(config["max_inflight_turns"])
+        self.turns_inflight = 0
+        self.sessions = {}
+        self.stats = {
+            "sessions_total": 0,
+            "sessions_rejected": 0,
+            "turns_completed": 0,
+            "turns_rejected": 0,
+            "turns_cancelled": 0,
+            "turns_interrupted": 0,
+            "turns_failed": 0,
+        }
+
+    def snapshot(self):
+        return dict(self.stats, sessions_active=len(self.sessions), turns_inflight=self.turns_inflight)
+
+    async def handler(self, connection):
+        if len(self.sessions) >= self.config["max_sessions"]:
+            self.stats["sessions_rejected"] += 1
+            await connection.send(json.dumps({"type": "busy", "message": "server at capacity"}))
+            await connection.close(1013, "server at capacity")
+            return
+
+        query = parse_qs(urlparse(connection.request.path).query)
+        agent_name = query.get("agent", ["Weather Agent"])[0]
+        if agent_name not in AGENT_REGISTRY:
+            await connection.close(1008, f"unknown agent {agent_name!r}")
+            return
+
+        session = VoiceSession(self, connection, self.pipeline_for(agent_name))
+        self.sessions[session.id] = session
+        self.stats["sessions_total"] += 1
+        try:
+            await session.run()
+        finally:
+            del self.sessions[session.id]
+
+
+class VoiceSession:
+    """One client connection: read frames, segment turns, stream replies"""
+
+    def __init__(self, server, connection, pipeline):
+        self.id = uuid.uuid4().hex[:12]
+        self.server = server
+        self.connection = connection
+        self.pipeline = pipeline
+        self.frames = asyncio.Queue(maxsize=server.config["frame_queue_size"])
+        self.turns = asyncio.Queue(maxsize=server.config["turn_queue_size"])
+        self.current_turn = None
+        self.interrupted_turn = None  # cancelled by barge-in rather than a disconnect
+        self.memory = ConversationMemory() if MEMORY_CONFIG["enabled"] else None
+
+    async def send_event(self, event_type, **fields):
+        await self.connection.send(json.dumps({"type": event_type, **fields}))
+
+    async def run(self):
+        await self.send_event("ready", session=self.id, sample_rate=AUDIO_CONFIG["sample_rate"])
+        tasks = [
+            asyncio.create_task(self.read_frames()),
+            asyncio.create_task(self.segment_turns()),
+            asyncio.create_task(self.respond()),
+        ]
+        try:
+            # The reader finishes when the client disconnects; everything else is torn down with it.
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def read_frames(self):
+        try:
+            async for message in self.connection:
+                if isinstance(message, bytes):
+                    # Blocks when the queue is full, which stops reading from the socket.
+                    await self.frames.put(np.frombuffer(message, dtype="<i2"))
+                    continue
+                try:
+                    control = json.loads(message)
+                except ValueError:
+                    await self.send_event("error", message="expected JSON control message")
+                    continue
+                if control.get("type") == "end_turn":
+                    await self.frames.put(_END_TURN)
+                elif control.get("type") == "stats":
+                    await self.send_event("stats", **self.server.snapshot())
+        except ConnectionClosed:
+            pass
+
+    async def segment_turns(self):
+        endpointer = EnergyEndpointer()
+        blocks = []
+        while True:
+            block = await self.frames.get()
+            done = block is _END_TURN
+            if not done:
+                blocks.append(block)
+                was_speaking = endpointer.speech_started
+                done = endpointer.process(block)
+                if endpointer.speech_started and not was_speaking:
+                    await self.barge_in()
+            if not done:
+                continue
+            if blocks and (endpointer.speech_started or block is _END_TURN):
+                try:
+                    # Never wait here: this loop also has to keep spotting barge-ins.
+                    self.turns.put_nowait(np.concatenate(blocks))
+                except asyncio.QueueFull:
+                    self.server.stats["turns_rejected"] += 1
+                    await self.send_event("busy", message="too many turns queued, try again")
+            blocks = []
+            endpointer.reset()
+
+    async def barge_in(self):
+        """The client started talking again: cut off the reply that is still running"""
+        turn = self.current_turn
+        if not self.server.config["barge_in"] or turn is None or turn.done():
+            return
+        start = time.perf_counter()
+        self.interrupted_turn = turn
+        turn.cancel()
+        await asyncio.wait([turn])
+        self.server.stats["turns_interrupted"] += 1
+        await self.send_event("barge_in", cancel_ms=1000 * (time.perf_counter() - start))
+
+    async def respond(self):
+        config = self.server.config
+        while True:
+            audio = await self.turns.get()
+            try:
+                await asyncio.wait_for(self.server.inflight.acquire(), config["admission_timeout"])
+            except asyncio.TimeoutError:
+                self.server.stats["turns_rejected"] += 1
+                await self.send_event("busy", message="too many turns in flight, try again")
+                continue
+            self.server.turns_inflight += 1
+            # Run the turn as its own task so a barge-in can cancel it without stopping this loop.
+            self.current_turn = asyncio.create_task(self.run_turn(audio))
+            try:
+                await asyncio.wait([self.current_turn])
+            except asyncio.CancelledError:
+                self.current_turn.cancel()
+                raise
+            finally:
+                self.current_turn = None
+                self.server.turns_inflight -= 1
+                self.server.inflight.release()
+
+    async def run_turn(self, audio):
+        stats = self.server.stats
+        start = time.perf_counter()
+        first_audio = None
+        result = None
+        record = record_turn(self.memory)
+        await self.send_event("turn_started")
+        try:
+            result = await self.pipeline.run(AudioInput(buffer=audio, frame_rate=AUDIO_CONFIG["sample_rate"]))
+            async for event in result.stream():
+                if event.type == "voice_stream_event_audio":
+                    if first_audio is None:
+                        first_audio = time.perf_counter()
+                    await self.connection.send(np.asarray(event.data, dtype="<i2").tobytes())
+                elif event.type == "voice_stream_event_error":
+                    await self.send_event("error", message=str(event.error))
+        except asyncio.CancelledError:
+            # Barge-in or the client went away mid-turn: stop the upstream STT/LLM/TTS work too.
+            # Barge-ins are counted as turns_interrupted by barge_in().
+            if asyncio.current_task() is not self.interrupted_turn:
+                stats["turns_cancelled"] += 1
+            if result is not None:
+                cancel_result(result)
+            raise
+        except ConnectionClosed:
+            stats["turns_cancelled"] += 1
+            if result is not None:
+                cancel_result(result)
+            return
+        except Exception as e:
+            stats["turns_failed"] += 1
+            logger.exception("Turn failed in session %s", self.id)
+            await self.send_event("error", message=str(e))
+            return
+        stats["turns_completed"] += 1
+        await self.send_event(
+            "turn_ended",
+            ttfa_ms=1000 * (first_audio - start) if first_audio is not None else None,
+            total_ms=1000 * (time.perf_counter() - start),
+            transcript=record.transcript,
+            reply=record.reply,
+            agent=record.agent,
+            tokens=self.memory.stats() if self.memory is not None else None,
+        )
+
+
+def stub_pipeline_factory():
+    """Pipelines on the local fake models, with a stub weather server behind fetch_weather"""
+    import os
+
+    from agents import set_tracing_disabled
+
+    from agents_setup import agent, language_agents
+    from benchmarks.fakes import fake_pipeline
+    from benchmarks.stub_weather import StubWeatherServer
+    from config import ROUTING_CONFIG
+    from registry import get_agent
+
+    set_tracing_disabled(True)
+    weather = StubWeatherServer().start()
+    os.environ.setdefault("WEATHER_API_KEY", "stub")
+    os.environ["WEATHER_API_URL"] = weather.url
+    pipelines = {}
+
+    def pipeline_for(agent_name):
+        if agent_name not in pipelines:
+            selected = get_agent(agent_name)
+            routes = language_agents if ROUTING_CONFIG["enabled"] and selected is agent else None
+            pipelines[agent_name] = fake_pipeline(selected, language_routes=routes)
+        return pipelines[agent_name]
+
+    return pipeline_for
+
+
+async def serve_forever(host, port, pipeline_for):
+    server = VoiceServer(pipeline_for)
+    async with serve(server.handler, host, port, max_size=2 ** 20) as ws_server:
+        logger.info("Voice server listening on ws://%s:%s", host, port)
+        await ws_server.serve_forever()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless multi-session voice agent server")
+    parser.add_argument("--host", default=SERVER_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=SERVER_CONFIG["port"])
+    parser.add_argument(
+        "--stub-models",
+        action="store_true",
+        help="use the local fake STT/LLM/TTS and a stub weather API (no network, for load tests)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from bootstrap import load_env
+
+    load_env()
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    pipeline_for = stub_pipeline_factory() if args.stub_models else get_pipeline
+    asyncio.run(serve_forever(args.host, args.port, pipeline_for))
@@ -0,0 +1,96 @@
+"""
+Vectorized silence trimming and pause compression before STT upload
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from config import AUDIO_CONFIG
+
+
+def frame_energies_db(samples, frame_len):
+    """Energy (dBFS) of consecutive non-overlapping frames, via a strided view"""
+    samples = np.ascontiguousarray(samples)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+    step = samples.strides[0]
+    frames = as_strided(samples, shape=(n_frames, frame_len), strides=(frame_len * step, step), writeable=False)
+    scale = 32768.0 if samples.dtype == np.int16 else 1.0
+    power = np.square(frames, dtype=np.float32).mean(axis=1) / (scale * scale)
+    return 10.0 * np.log10(power + 1e-12)
+
+
+def trim_silence(
+    samples,
+    sample_rate=AUDIO_CONFIG["sample_rate"],
+    frame_ms=AUDIO_CONFIG["trim_frame_ms"],
+    threshold_db=AUDIO_CONFIG["trim_threshold_db"],
+    relative_db=AUDIO_CONFIG["trim_relative_db"],
+    padding_ms=AUDIO_CONFIG["trim_padding_ms"],
+    max_pause_ms=AUDIO_CONFIG["max_pause_ms"],
+):
+    """Drop leading/trailing silence and optionally shorten long internal pauses.
+
+    Returns (samples, report) where report holds the input/output durations and
+    how much audio was removed at each stage, in milliseconds. Audio with no
+    detectable speech is returned unchanged.
+    """
+    samples = np.asarray(samples).reshape(-1)
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    total_ms = 1000.0 * len(samples) / sample_rate
+    report = {
+        "input_ms": total_ms,
+        "output_ms": total_ms,
+        "removed_ms": 0.0,
+        "leading_ms": 0.0,
+        "trailing_ms": 0.0,
+        "compressed_ms": 0.0,
+        "speech_detected": False,
+    }
+
+    energies = frame_energies_db(samples, frame_len)
+    if energies.size == 0:
+        return samples, report
+    cutoff = max(threshold_db, float(energies.max()) - relative_db)
+    voiced = energies >= cutoff
+    voiced_idx = np.flatnonzero(voiced)
+    if voiced_idx.size == 0:
+        return samples, report
+    report["speech_detected"] = True
+
+    n_frames = energies.size
+    pad = int(np.ceil(padding_ms / frame_ms))
+    first = max(0, voiced_idx[0] - pad)
+    last = min(n_frames - 1, voiced_idx[-1] + pad)
+
+    keep = np.zeros(n_frames, dtype=bool)
+    keep[first:last + 1] = True
+
+    if max_pause_ms is not None:
+        max_pause = max(1, int(max_pause_ms / frame_ms))
+        # Run-length encode the silent stretches between the first and last voiced frames.
+        inner = ~voiced[voiced_idx[0]:voiced_idx[-1] + 1]
+        edges = np.diff(np.concatenate(([0], inner.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1) + voiced_idx[0]
+        ends = np.flatnonzero(edges == -1) + voiced_idx[0]
+        for start, end in zip(starts, ends):
+            if end - start > max_pause:
+                # Keep half the allowed pause on each side of the gap.
+                head = max_pause // 2
+                keep[start + head:end - (max_pause - head)] = False
+
+    sample_keep = np.repeat(keep, frame_len)
+    # Samples past the last whole frame follow the last frame's decision.
+    tail = len(samples) - sample_keep.size
+    if tail:
+        sample_keep = np.concatenate((sample_keep, np.full(tail, keep[-1])))
+    trimmed = samples[sample_keep]
+
+    frame_to_ms = frame_len * 1000.0 / sample_rate
+    report["leading_ms"] = first * frame_to_ms
+    report["trailing_ms"] = total_ms - (last + 1) * frame_to_ms if last < n_frames - 1 else 0.0
+    report["output_ms"] = 1000.0 * len(trimmed) / sample_rate
+    report["removed_ms"] = total_ms - report["output_ms"]
+    report["compressed_ms"] = max(0.0, report["removed_ms"] - report["leading_ms"] - report["trailing_ms"])
+    return trimmed, report
@@ -0,0 +1,58 @@
+"""
+Speculative tool prefetch: start the weather lookup as soon as the transcript asks for it
+"""
+
+import time
+from collections import deque
+
+import tools
+from config import SPECULATION_CONFIG
+from intent import weather_city
+
+
+class WeatherPrefetcher:
+    """Fire `fetch_weather`'s lookup from the transcript, before the LLM decides to call it.
+
+    The local matcher (intent.weather_city) is cheap but can be wrong, so
+    prefetches are capped at `max_per_minute`; those the model never claims
+    are counted as wasted by tools.prefetch_weather.
+    """
+
+    def __init__(self, max_per_minute=SPECULATION_CONFIG["max_per_minute"], window=SPECULATION_CONFIG["window"]):
+        self.max_per_minute = max_per_minute
+        self.window = window
+        self._recent = deque()
+        self.rate_limited = 0
+
+    def speculate(self, transcript, agent):
+        """Prefetch the city a weather question names, if `agent` could call the tool"""
+        if not any(getattr(tool, "name", None) == "fetch_weather" for tool in agent.tools):
+            return False
+        city = weather_city(transcript)
+        if city is None:
+            return False
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > 60:
+            self._recent.popleft()
+        if len(self._recent) >= self.max_per_minute:
+            self.rate_limited += 1
+            return False
+        if not tools.prefetch_weather(city, self.window):
+            return False
+        self._recent.append(now)
+        return True
+
+    def stats(self):
+        started = tools.prefetch_stats["started"]
+        used = tools.prefetch_stats["used"]
+        return {
+            "started": started,
+            "used": used,
+            "wasted": tools.prefetch_stats["wasted"],
+            "rate_limited": self.rate_limited,
+            "saved_ms_total": tools.prefetch_stats["saved_ms"],
+            "saved_ms_per_use": tools.prefetch_stats["saved_ms"] / used if used else 0.0,
+        }
+
+
+weather_prefetcher = WeatherPrefetcher()
@@ -294,20 +294,28 @@
 import streamlit as st
 import asyncio
 import numpy as np
-import os
-import io
-import scipy.io.wavfile as wavfile
+import time
+import uuid
 from audio_recorder_streamlit import audio_recorder
-from dotenv import load_dotenv
 
-# Import your existing modules
-from agents.voice import AudioInput, SingleAgentVoiceWorkflow, VoicePipeline
-from agents_setup import agent, spanish_agent
-from tools import fetch_weather
-from config import APP_CONFIG, AUDIO_CONFIG, AGENTS, CSS_STYLES
+# Import your existing modules. The Agents SDK and everything built on it
+# (pipelines, caches, connections) is imported where first used, so the
+# page renders before the SDK has loaded.
+from bootstrap import load_env
+from config import (
+    APP_CONFIG, AUDIO_CONFIG, AGENTS, CONVERSATION_LOG_CONFIG, CSS_STYLES, MEMORY_CONFIG, OPENAI_CONFIG,
+    RESPONSE_CACHE_CONFIG, SPECULATION_CONFIG, TTS_CACHE_CONFIG
+)
+from audio_ingest import ingest_wav
+from audio_store import AudioStore, encode_audio
+from conversation_log import ConversationLog, prune_sessions, valid_session_id
+from silence import trim_silence
+from background_loop import BackgroundLoop
+from memory import ConversationMemory
+import metrics
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 # Page configuration
 st.set_page_config(
@@ -320,9 +328,39 @@ st.set_page_config(
 # Apply custom CSS
 st.markdown(CSS_STYLES, unsafe_allow_html=True)
 
+@st.cache_resource
+def prune_old_conversations():
+    """Apply the conversation log retention policy once per server process"""
+    return prune_sessions()
+
+def open_conversation_log():
+    """This session's conversation log, resumed from the ?session= id in the URL if there is one"""
+    if not CONVERSATION_LOG_CONFIG["enabled"]:
+        return None
+    prune_old_conversations()
+    session_id = st.query_params.get("session")
+    if not valid_session_id(session_id):
+        session_id = uuid.uuid4().hex
+        st.query_params["session"] = session_id
+    return ConversationLog(session_id)
+
+def resume_memory(memory, chat_history):
+    """Refill conversation memory from a resumed chat history"""
+    user_text = None
+    for message in chat_history:
+        if message["type"] == "user":
+            user_text = message.get("transcript")
+        elif user_text:
+            memory.add_turn(user_text, message["text"])
+            user_text = None
+
 # Initialize session state
+if 'conversation_log' not in st.session_state:
+    # Messages and reply audio on disk, so the conversation survives a restart
+    st.session_state.conversation_log = open_conversation_log()
 if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+    log = st.session_state.conversation_log
+    st.session_state.chat_history = log.messages() if log is not None else []
 if 'api_key' not in st.session_state:
     st.session_state.api_key = ""
 if 'selected_agent' not in st.session_state:
@@ -331,101 +369,159 @@ if 'is_processing' not in st.session_state:
     st.session_state.is_processing = False
 if 'last_audio_bytes' not in st.session_state:
     st.session_state.last_audio_bytes = None
+if 'pending_turn' not in st.session_state:
+    st.session_state.pending_turn = None
+if 'audio_store' not in st.session_state:
+    st.session_state.audio_store = AudioStore()
+if 'last_breakdown' not in st.session_state:
+    st.session_state.last_breakdown = {}
+if 'memory' not in st.session_state:
+    # What the agents remember of this conversation (chat_history is only what's shown)
+    st.session_state.memory = ConversationMemory() if MEMORY_CONFIG["enabled"] else None
+    if st.session_state.memory is not None:
+        resume_memory(st.session_state.memory, st.session_state.chat_history)
 
-def setup_agents():
-    """Setup agents with the provided API key"""
-    os.environ["OPENAI_API_KEY"] = st.session_state.api_key
-    
-    # Create weather agent
-    weather_agent = agent
-    
-    # Create Urdu agent
-    urdu_agent = type(agent)(
-        name="UrduAgent",
-        handoff_description="Handles Urdu conversations.",
-        instructions="You are a polite assistant who always replies in Urdu. Be helpful and conversational.",
-        model="gpt-4o",
-    )
-    
-    return {
-        "Weather Agent": weather_agent,
-        "Spanish Agent": spanish_agent,
-        "Urdu Agent": urdu_agent
-    }
+@st.cache_resource
+def get_background_loop():
+    """One long-lived event loop per server process, shared by every session"""
+    return BackgroundLoop()
+
+@st.cache_resource
+def warm_up_connections(api_key):
+    """Open pooled API connections for a key once per process"""
+    from connections import warm_up
+    from registry import get_pipeline
+    from tts_cache import warm_tts_cache
+
+    loop = get_background_loop()
+    future = loop.submit(warm_up(api_key))
+    if TTS_CACHE_CONFIG["enabled"] and TTS_CACHE_CONFIG["warm_up"]:
+        # Pre-synthesize the stock phrases so their first use replays from cache.
+        loop.submit(warm_tts_cache(get_pipeline("Weather Agent", api_key)))
+    return future
+
+def add_to_chat(message, audio_data=None, sample_rate=None):
+    """Add a message (and its reply audio) to the chat, through the conversation log when it's on"""
+    store = st.session_state.audio_store
+    log = st.session_state.conversation_log
+    audio = None
+    if audio_data is not None:
+        try:
+            # Encode the reply audio once; reruns reuse the stored bytes
+            if log is None:
+                message["audio_id"] = store.put(audio_data, sample_rate)
+            else:
+                audio = encode_audio(audio_data, sample_rate, store.format)
+        except Exception as e:
+            st.warning(f"Audio processing error: {str(e)}")
+    if log is None:
+        st.session_state.chat_history.append(message)
+        return
+    log.append(message, audio, store.mime_type)
+    # Re-read rather than append: compaction may have moved older clips.
+    st.session_state.chat_history = log.messages()
+
+def message_audio(message):
+    """Encoded audio and MIME type for a chat message, or (None, None)"""
+    if message.get("audio"):
+        return st.session_state.conversation_log.read_audio(message["audio"]), message["audio"]["mime"]
+    if message.get("audio_id"):
+        return st.session_state.audio_store.get(message["audio_id"]), st.session_state.audio_store.mime_type
+    return None, None
 
 def convert_audio_bytes_to_numpy(audio_bytes):
-    """Convert audio bytes to numpy array"""
+    """Convert audio bytes to mono int16 samples at the pipeline sample rate"""
     try:
-        # Create BytesIO object from bytes
-        audio_io = io.BytesIO(audio_bytes)
-        
-        # Read the WAV file
-        sample_rate, audio_data = wavfile.read(audio_io)
-        
-        # Convert to float32 and normalize
-        if audio_data.dtype == np.int16:
-            audio_data = audio_data.astype(np.float32) / 32768.0
-        elif audio_data.dtype == np.int32:
-            audio_data = audio_data.astype(np.float32) / 2147483648.0
-        
-        # Handle stereo by taking the first channel
-        if len(audio_data.shape) > 1:
-            audio_data = audio_data[:, 0]
-            
-        return audio_data, sample_rate
+        # Parse the WAV in place, downmix, and resample 44.1 kHz -> AUDIO_CONFIG rate
+        return ingest_wav(audio_bytes, AUDIO_CONFIG["sample_rate"])
         
     except Exception as e:
         st.error(f"Error converting audio: {str(e)}")
         return None, None
 
-async def process_voice_input(audio_data, selected_agent):
+async def process_voice_input(audio_data, pipeline, sample_rate=AUDIO_CONFIG["sample_rate"], progress=None,
+                              timer=metrics.NULL_TIMER, memory=None):
     """Process voice input and get agent response"""
+    from agents.voice import AudioInput
+    from workflow import cancel_result, record_turn
+
+    metrics.activate(timer)
+    record = record_turn(memory)
+    if progress is not None:
+        progress["record"] = record
+    result = None
     try:
-        pipeline = VoicePipeline(workflow=SingleAgentVoiceWorkflow(selected_agent))
-        audio_input = AudioInput(buffer=audio_data)
+        audio_input = AudioInput(buffer=audio_data, frame_rate=sample_rate)
+        timer.mark("pipeline_start")
         result = await pipeline.run(audio_input)
         
-        # Collect the response
+        # Collect the response; its text comes from the workflow's turn record
         response_audio = []
-        response_text = ""
         
         async for event in result.stream():
             if event.type == "voice_stream_event_audio":
+                timer.mark("first_audio")
                 response_audio.append(event.data)
-            elif event.type == "voice_stream_event_text":
-                response_text += event.text
+                if progress is not None:
+                    progress["stage"] = "Synthesizing speech"
+                    progress["audio_chunks"] += 1
         
-        return response_text, np.concatenate(response_audio) if response_audio else None
+        return record.reply, np.concatenate(response_audio) if response_audio else None
         
+    except asyncio.CancelledError:
+        # Cancel button: stop the pipeline's STT/LLM/TTS tasks, not just this consumer.
+        if result is not None:
+            cancel_result(result)
+        raise
     except Exception as e:
         return f"Error processing voice input: {str(e)}", None
+    finally:
+        timer.finish()
 
-def create_audio_player(audio_data, sample_rate=44100):
-    """Create audio player for response audio"""
-    if audio_data is None:
-        return None
+def wait_for_pending_turn():
+    """Poll the in-flight turn, showing progress until it finishes"""
+    turn = st.session_state.pending_turn
+    future = turn["future"]
+    status = st.empty()
+    while not future.done():
+        elapsed = time.monotonic() - turn["started"]
+        status.info(f"🤖 {turn['progress']['stage']}... ({elapsed:.1f}s)")
+        time.sleep(0.1)
+    status.empty()
+    st.session_state.pending_turn = None
+    st.session_state.is_processing = False
+    st.session_state.last_breakdown = turn["timer"].breakdown()
     
+    if future.cancelled():
+        st.warning("⏹️ Response cancelled")
+        return
     try:
-        # Normalize audio data to 16-bit range
-        if isinstance(audio_data, np.ndarray):
-            if audio_data.dtype != np.int16:
-                max_val = np.max(np.abs(audio_data))
-                if max_val > 0:
-                    audio_normalized = np.int16(audio_data * 32767 / max_val)
-                else:
-                    audio_normalized = np.int16(audio_data)
-            else:
-                audio_normalized = audio_data
-            
-            # Create WAV file in memory
-            buffer = io.BytesIO()
-            wavfile.write(buffer, sample_rate, audio_normalized)
-            buffer.seek(0)
-            return buffer
-            
+        response_text, response_audio = future.result()
     except Exception as e:
-        st.warning(f"Audio processing error: {str(e)}")
-        return None
+        st.error(f"Error processing audio: {str(e)}")
+        return
+    
+    # Show what was actually heard in place of the voice-message placeholder
+    record = turn["progress"].get("record")
+    if record is not None and record.transcript:
+        for message in reversed(st.session_state.chat_history):
+            if message["type"] == "user":
+                message["text"] = f"🎤 {record.transcript}"
+                if st.session_state.conversation_log is not None:
+                    st.session_state.conversation_log.update(
+                        message["seq"], text=message["text"], transcript=record.transcript
+                    )
+                break
+    
+    # Add agent response to chat
+    add_to_chat({
+        "type": "agent",
+        "text": response_text,
+        "agent": turn["agent"]
+    }, response_audio, turn["sample_rate"])
+    
+    st.success("🎉 Response received!")
+    st.rerun()
 
 def main():
     # Header
@@ -452,6 +548,8 @@ def main():
         if api_key:
             st.session_state.api_key = api_key
             st.success("✅ API Key configured")
+            if OPENAI_CONFIG["warm_up"]:
+                warm_up_connections(api_key)
         
         st.markdown("### 🤖 Select Agent")
         
@@ -478,19 +576,81 @@ def main():
             icon_name="microphone-lines",
             icon_size="6x",
             pause_threshold=2.0,
-            sample_rate=44100,
+            # Record at the pipeline rate (the browser resamples), so ingest skips the resampler.
+            sample_rate=AUDIO_CONFIG["sample_rate"],
         )
         
         # Status indicator
         if st.session_state.is_processing:
             st.warning("🟡 Processing your message...")
+            if st.button("⏹️ Cancel Response", use_container_width=True) and st.session_state.pending_turn:
+                st.session_state.pending_turn["future"].cancel()
         else:
             st.success("🟢 Ready to record!")
         
         # Clear chat button
         if st.button("🗑️ Clear Chat", use_container_width=True):
             st.session_state.chat_history = []
+            st.session_state.audio_store.clear()
+            if st.session_state.conversation_log is not None:
+                st.session_state.conversation_log.clear()
+            if st.session_state.memory is not None:
+                st.session_state.memory.clear()
             st.rerun()
+        
+        # Per-turn latency breakdown (VOICE_METRICS=1 or METRICS_CONFIG["enabled"])
+        if metrics.is_enabled() and st.session_state.last_breakdown:
+            with st.expander("⏱️ Last turn latency"):
+                for stage_name, ms in sorted(st.session_state.last_breakdown.items(), key=lambda item: item[1]):
+                    st.markdown(f"- **{stage_name}**: {ms:.0f} ms")
+        
+        if st.session_state.conversation_log is None:
+            store_stats = st.session_state.audio_store.stats()
+            st.caption(
+                f"🔊 Audio cache: {store_stats['bytes_held'] / 1024:.0f} KiB held, "
+                f"{store_stats['encodes_avoided']} encodes avoided, {store_stats['evictions']} evicted"
+            )
+        else:
+            log_stats = st.session_state.conversation_log.stats()
+            st.caption(
+                f"💾 Saved conversation: {log_stats['messages']} messages, "
+                f"{log_stats['audio_bytes'] / 1024:.0f} KiB of audio on disk; reopen this URL to resume"
+            )
+        if st.session_state.chat_history:
+            # Cache stats only mean something after a turn, by which point the SDK is loaded anyway.
+            from tts_cache import tts_cache
+
+            speech_stats = tts_cache.stats()
+            st.caption(
+                f"🗣️ Speech cache: {speech_stats['hits'] + speech_stats['disk_hits']} hits, "
+                f"{speech_stats['misses']} misses ({speech_stats['hit_ratio']:.0%})"
+            )
+        if st.session_state.memory is not None:
+            memory_stats = st.session_state.memory.stats()
+            tokens = f"🧠 Memory: {memory_stats['turns']} turns, ~{memory_stats['context_tokens']} tokens of context"
+            if "input_tokens" in memory_stats:
+                tokens += (
+                    f"; last turn {memory_stats['input_tokens']} in "
+                    f"({memory_stats['cached_tokens']} cached), {memory_stats['output_tokens']} out"
+                )
+            st.caption(tokens)
+        if SPECULATION_CONFIG["enabled"] and st.session_state.chat_history:
+            from speculation import weather_prefetcher
+
+            prefetch_stats = weather_prefetcher.stats()
+            if prefetch_stats["started"]:
+                st.caption(
+                    f"⚡ Weather prefetch: {prefetch_stats['used']}/{prefetch_stats['started']} used, "
+                    f"{prefetch_stats['wasted']} wasted, ~{prefetch_stats['saved_ms_per_use']:.0f} ms saved each"
+                )
+        if RESPONSE_CACHE_CONFIG["enabled"] and st.session_state.chat_history:
+            from response_cache import response_cache
+
+            reply_stats = response_cache.stats()
+            st.caption(
+                f"♻️ Reply cache: {reply_stats['hits']} hits, {reply_stats['misses']} misses "
+                f"({reply_stats['hit_ratio']:.0%})"
+            )
     
     # Main content area
     col1, col2 = st.columns([2, 1])
@@ -509,10 +669,10 @@ def main():
                 st.markdown(f'<div style="background: white; border: 1px solid #e0e0e0; padding: 0.75rem; border-radius: 10px; margin: 0.5rem 0; max-width: 80%;">🤖 {message["agent"]}: {message["text"]}</div>', unsafe_allow_html=True)
                 
                 # Display audio player if available
-                if "audio_data" in message and message["audio_data"] is not None:
-                    audio_buffer = create_audio_player(message["audio_data"], message.get("sample_rate", 44100))
-                    if audio_buffer:
-                        st.audio(audio_buffer, format="audio/wav")
+                # Not `audio_bytes`: that name holds the recorder's clip, checked below.
+                clip_bytes, clip_mime = message_audio(message)
+                if clip_bytes:
+                    st.audio(clip_bytes, format=clip_mime)
     
     with col2:
         st.markdown("### 📋 How to Use")
@@ -549,56 +709,58 @@ def main():
             
             # Process the audio if API key is provided
             if st.session_state.api_key and not st.session_state.is_processing:
-                st.session_state.is_processing = True
                 st.session_state.last_audio_bytes = audio_bytes
                 
                 try:
                     # Convert audio to numpy array
-                    with st.spinner("🎵 Converting audio..."):
+                    timer = metrics.new_turn()
+                    with st.spinner("🎵 Converting audio..."), timer.stage("decode"):
                         audio_data, sample_rate = convert_audio_bytes_to_numpy(audio_bytes)
                     
+                    if audio_data is not None and AUDIO_CONFIG["trim_silence"]:
+                        # Don't upload the dead air before and after the speech
+                        with timer.stage("trim"):
+                            audio_data, trim_report = trim_silence(audio_data, sample_rate)
+                        if trim_report["removed_ms"] > 0:
+                            st.caption(f"✂️ Trimmed {trim_report['removed_ms'] / 1000:.1f}s of silence")
+                    
                     if audio_data is not None:
-                        # Setup agents
-                        agents = setup_agents()
-                        selected_agent = agents[st.session_state.selected_agent]
+                        # Resolve the cached pipeline for this agent and key
+                        from registry import get_pipeline
+
+                        pipeline = get_pipeline(st.session_state.selected_agent, st.session_state.api_key)
                         
                         # Add user message to chat
-                        st.session_state.chat_history.append({
+                        add_to_chat({
                             "type": "user",
                             "text": "🎤 Voice message",
                             "agent": "User"
                         })
                         
-                        # Process with agent
-                        with st.spinner("🤖 Getting AI response..."):
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            try:
-                                response_text, response_audio = loop.run_until_complete(
-                                    process_voice_input(audio_data, selected_agent)
+                        # Hand the turn to the background loop; the script only polls it
+                        progress = {"stage": "Transcribing and thinking", "audio_chunks": 0}
+                        st.session_state.pending_turn = {
+                            "future": get_background_loop().submit(
+                                process_voice_input(
+                                    audio_data, pipeline, sample_rate, progress, timer, st.session_state.memory
                                 )
-                            finally:
-                                loop.close()
-                        
-                        # Add agent response to chat
-                        st.session_state.chat_history.append({
-                            "type": "agent",
-                            "text": response_text,
+                            ),
+                            "progress": progress,
+                            "timer": timer,
                             "agent": st.session_state.selected_agent,
-                            "audio_data": response_audio,
-                            "sample_rate": sample_rate
-                        })
-                        
-                        st.success("🎉 Response received!")
-                        st.rerun()
+                            "sample_rate": sample_rate,
+                            "started": time.monotonic(),
+                        }
+                        st.session_state.is_processing = True
                         
                 except Exception as e:
                     st.error(f"Error processing audio: {str(e)}")
-                finally:
-                    st.session_state.is_processing = False
             
             elif not st.session_state.api_key:
                 st.warning("⚠️ Please enter your OpenAI API key to process audio!")
+        
+        if st.session_state.pending_turn is not None:
+            wait_for_pending_turn()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
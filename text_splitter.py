@@ -0,0 +1,92 @@
+"""
+Language-aware text splitting for TTS: a short first chunk, then larger ones
+"""
+
+import re
+
+from config import TTS_SPLIT_CONFIG
+
+# Sentence ends, including the Urdu full stop and Arabic question mark, plus closing quotes.
+# A following space is required so "12.5" or a half-streamed "3." isn't split.
+SENTENCE_END = re.compile(r"[.!?…。۔؟]+[\"'”’)\]]*(?=\s)")
+# Spanish opening marks start a new sentence even without a full stop before them
+SENTENCE_START = re.compile(r"\s(?=[¿¡])")
+# Clause breaks: comma, semicolon, colon (Latin and Arabic script), dash
+CLAUSE_END = re.compile(r"[,;:،؛—]+(?=\s)")
+SPACE = re.compile(r"\s")
+
+
+def _inside_inverted_mark(text, pos):
+    """True if `pos` falls inside a Spanish ¿...? or ¡...! that hasn't closed yet"""
+    opened = text.count("¿", 0, pos) + text.count("¡", 0, pos)
+    closed = text.count("?", 0, pos) + text.count("!", 0, pos)
+    return opened > closed
+
+
+def _sentence_cuts(text):
+    cuts = [m.end() for m in SENTENCE_END.finditer(text)]
+    cuts += [m.start() for m in SENTENCE_START.finditer(text)]
+    return sorted(set(cuts))
+
+
+def _soft_cut(text, limit, minimum):
+    """Last clause break (else last space) in text[:limit], not inside a ¿...? question"""
+    for pattern, use_end in ((CLAUSE_END, True), (SPACE, False)):
+        cuts = [m.end() if use_end else m.start() for m in pattern.finditer(text, 0, limit)]
+        cuts = [c for c in cuts if c >= minimum and not _inside_inverted_mark(text, c)]
+        if cuts:
+            return cuts[-1]
+    return None
+
+
+def make_text_splitter(strategy=TTS_SPLIT_CONFIG["strategy"],
+                       first_min_chars=TTS_SPLIT_CONFIG["first_min_chars"],
+                       first_max_chars=TTS_SPLIT_CONFIG["first_max_chars"],
+                       min_chars=TTS_SPLIT_CONFIG["min_chars"],
+                       max_chars=TTS_SPLIT_CONFIG["max_chars"],
+                       turn_state=None):
+    """Build a `TTSModelSettings.text_splitter`.
+
+    "sentence" is the SDK's default splitter. "adaptive" sends the first
+    clause of a reply to TTS as soon as it has `first_min_chars`, so audio
+    can start early, then batches whole sentences of at least `min_chars`
+    so later requests are fewer and sound more natural. Over-long text is
+    split at a clause break or space at `first_max_chars` / `max_chars`.
+
+    The splitter is shared by every turn of a pipeline, so whether a chunk is
+    the turn's first comes from `turn_state()`, which returns an object with
+    a `tts_chunks` counter (the workflow's current TurnRecord) or None.
+    """
+    if strategy == "sentence":
+        from agents.voice.utils import get_sentence_based_splitter
+
+        return get_sentence_based_splitter()
+    if strategy != "adaptive":
+        raise ValueError(f"Unknown TTS split strategy {strategy!r}")
+
+    def adaptive_text_splitter(text_buffer):
+        state = turn_state() if turn_state is not None else None
+        first = state is not None and state.tts_chunks == 0
+        cuts = _sentence_cuts(text_buffer)
+        cut = None
+        if first:
+            early = [c for c in cuts + [m.end() for m in CLAUSE_END.finditer(text_buffer)]
+                     if c >= first_min_chars and not _inside_inverted_mark(text_buffer, c)]
+            if early:
+                cut = min(early)
+            elif len(text_buffer) >= first_max_chars:
+                cut = _soft_cut(text_buffer, first_max_chars, first_min_chars)
+        else:
+            ready = [c for c in cuts if c >= min_chars]
+            if ready:
+                cut = ready[-1]
+            elif len(text_buffer) >= max_chars:
+                cut = _soft_cut(text_buffer, max_chars, min_chars)
+        if cut is None:
+            return "", text_buffer
+        chunk, rest = text_buffer[:cut].strip(), text_buffer[cut:].lstrip()
+        if chunk and state is not None:
+            state.tts_chunks += 1
+        return chunk, rest
+
+    return adaptive_text_splitter
@@ -1,21 +1,210 @@
+import asyncio
+import json
 import os
-import requests
+import time
+from collections import Counter
+
 from agents import function_tool
-from dotenv import load_dotenv
 
-load_dotenv()
+import metrics
+from bootstrap import load_env
+from cache import TTLCache
+from config import WEATHER_CONFIG
+from connections import get_http_client
+from resilience import ResilientCall
 
-@function_tool
-async def fetch_weather(city: str) -> str:
+load_env()
+
+weather_cache = TTLCache(maxsize=WEATHER_CONFIG["cache_size"], ttl=WEATHER_CONFIG["cache_ttl"])
+# Reports kept past cache_ttl, served as the last known reading while the API is unavailable
+last_known_weather = TTLCache(maxsize=WEATHER_CONFIG["cache_size"], ttl=WEATHER_CONFIG["stale_ttl"])
+# Deadline, hedging and circuit breaker for OpenWeather requests
+weather_upstream = ResilientCall("weather")
+
+# Lookups in flight, shared by concurrent callers for the same city
+_inflight = {}
+# Speculative lookups not yet claimed by a tool call: city key -> (start time, task, end time holder).
+# Holding the task keeps its result (even "City not found.") for the tool call.
+_prefetched = {}
+prefetch_stats = Counter()
+
+
+class WeatherUnavailable(Exception):
+    """OpenWeather is slow, failing or short-circuited; `last_known` is the city's last report, if any"""
+
+    def __init__(self, city: str, last_known: str = None):
+        super().__init__(f"The weather service is not responding right now, so the weather in {city} is unavailable.")
+        self.city = city
+        self.last_known = last_known
+
+    def spoken(self) -> str:
+        """What the single-city tool tells the model: the last known reading, else a plain apology"""
+        if self.last_known is not None:
+            return f"{self.last_known} (last known reading; the weather service is not responding right now)"
+        return str(self)
+
+
+def normalize_city(city: str) -> str:
+    """Cache key for a city name: case- and whitespace-insensitive"""
+    return " ".join(city.split()).casefold()
+
+
+async def get_weather(city: str) -> str:
+    """Look up the current weather for a city, serving repeats from the TTL cache.
+
+    Concurrent lookups for the same city share one request, and a lookup
+    already started by `prefetch_weather` is claimed instead of repeated.
+    Raises WeatherUnavailable when OpenWeather can't answer in time.
+    """
+    key = normalize_city(city)
+    prefetched = _prefetched.pop(key, None)
+    if prefetched is not None:
+        started, task, finished = prefetched
+        asked = time.monotonic()
+        report = await asyncio.shield(task)
+        # The part of the lookup that ran before the model asked for it is off the critical path.
+        saved = max(0.0, min(asked, finished.get("at", asked)) - started)
+        prefetch_stats["used"] += 1
+        prefetch_stats["saved_ms"] += round(1000 * saved)
+        metrics.current().add("weather_prefetch_saved", saved)
+        return report
+
+    cached = weather_cache.get(key)
+    if cached is not None:
+        return cached
+    task = _inflight.get(key) or _start_lookup(city, key)
+    # Shielded: one caller giving up must not cancel the lookup for the others.
+    return await asyncio.shield(task)
+
+
+async def get_weather_bulk(cities, concurrency=WEATHER_CONFIG["bulk_concurrency"]):
+    """Look up several cities at once; return {"results": [...], "cached": n, "fetched": n}.
+
+    Repeated cities are looked up once, cached ones are answered without a
+    request and the rest are fetched concurrently, at most `concurrency` at
+    a time, so the wall time is about one round trip rather than one per
+    city. Each result has a "status": "ok" or "not_found" with the report,
+    "stale" with the last known report while the API is unavailable, or
+    "error"; one failed city doesn't fail the rest.
+    """
+    unique = {}
+    for city in cities:
+        if city.strip():
+            unique.setdefault(normalize_city(city), city.strip())
+    reports = {}
+    for key in unique:
+        # A pending prefetch is left for get_weather to claim, so it counts as used.
+        if key not in _prefetched:
+            cached = weather_cache.get(key)
+            if cached is not None:
+                reports[key] = cached
+    slots = asyncio.Semaphore(concurrency)
+
+    async def lookup(city):
+        async with slots:
+            return await get_weather(city)
+
+    misses = [key for key in unique if key not in reports]
+    outcomes = await asyncio.gather(*(lookup(unique[key]) for key in misses), return_exceptions=True)
+    reports.update(zip(misses, outcomes))
+
+    results = []
+    for key, city in unique.items():
+        report = reports[key]
+        if isinstance(report, WeatherUnavailable) and report.last_known is not None:
+            results.append({"city": city, "status": "stale", "report": report.last_known, "error": str(report)})
+        elif isinstance(report, Exception):
+            results.append({"city": city, "status": "error", "error": str(report)})
+        else:
+            status = "not_found" if report == "City not found." else "ok"
+            results.append({"city": city, "status": status, "report": report})
+    return {"results": results, "cached": len(unique) - len(misses), "fetched": len(misses)}
+
+
+def _start_lookup(city: str, key: str) -> asyncio.Task:
+    task = asyncio.ensure_future(_fetch_weather(city, key))
+    _inflight[key] = task
+    task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+
+def prefetch_weather(city: str, window: float = 30.0) -> bool:
+    """Start looking up `city` ahead of a likely tool call; False if there was nothing to do.
+
+    Prefetches not claimed by `get_weather` within `window` seconds are
+    counted as wasted.
+    """
+    now = time.monotonic()
+    for stale, (started, _, _) in list(_prefetched.items()):
+        if now - started > window:
+            del _prefetched[stale]
+            prefetch_stats["wasted"] += 1
+    key = normalize_city(city)
+    if key in _prefetched or key in _inflight or key in weather_cache:
+        return False
+    task = _start_lookup(city, key)
+    finished = {}
+
+    def on_done(t):
+        finished["at"] = time.monotonic()
+        # An unclaimed prefetch is never awaited; retrieve its error so it isn't logged.
+        if not t.cancelled():
+            t.exception()
+
+    task.add_done_callback(on_done)
+    _prefetched[key] = (now, task, finished)
+    prefetch_stats["started"] += 1
+    return True
+
+
+async def _fetch_weather(city: str, key: str) -> str:
     api_key = os.getenv("WEATHER_API_KEY")
     if not api_key:
         raise ValueError("WEATHER_API_KEY is not set. Please check your .env file.")
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-    response = requests.get(url)
-    data = response.json()
-    if data.get("cod") == 200:
-        main = data["main"]
-        weather = data["weather"][0]["description"]
-        return f"Weather in {city}: {weather}, Temperature: {main['temp']}°C"
-    else:
-        return "City not found."
+    base_url = os.getenv("WEATHER_API_URL", WEATHER_CONFIG["base_url"]).rstrip("/")
+
+    async def request():
+        response = await get_http_client().get(
+            f"{base_url}/weather",
+            params={"q": city, "appid": api_key, "units": "metric"},
+        )
+        # Server errors count against the upstream; a 404 is an answer ("City not found.").
+        if response.status_code >= 500:
+            response.raise_for_status()
+        data = response.json()
+        if data.get("cod") == 200:
+            main = data["main"]
+            weather = data["weather"][0]["description"]
+            report = f"Weather in {city}: {weather}, Temperature: {main['temp']}°C"
+            weather_cache.set(key, report)
+            last_known_weather.set(key, report)
+            return report
+        else:
+            return "City not found."
+
+    with metrics.stage("weather_http"):
+        try:
+            return await weather_upstream.call(request)
+        except Exception as e:
+            raise WeatherUnavailable(city, last_known_weather.get(key)) from e
+
+
+@function_tool
+async def fetch_weather(city: str) -> str:
+    try:
+        return await get_weather(city)
+    except WeatherUnavailable as e:
+        return e.spoken()
+
+
+@function_tool
+async def fetch_weather_bulk(cities: list[str]) -> str:
+    """Get the current weather for several cities in one call.
+
+    Use this instead of repeated fetch_weather calls when the user asks about
+    more than one city, e.g. to compare them.
+
+    Args:
+        cities: The city names, e.g. ["Lahore", "Karachi", "Madrid"].
+    """
+    return json.dumps(await get_weather_bulk(cities), ensure_ascii=False)
@@ -0,0 +1,155 @@
+"""
+Cache of synthesized speech for repeated text segments
+"""
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+
+from agents.voice import TTSModel, TTSModelSettings, VoiceModelProvider
+
+from config import TTS_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_segment(text):
+    """Whitespace- and case-insensitive form of a TTS text segment"""
+    return " ".join(text.split()).casefold()
+
+
+class TTSCache:
+    """Byte-bounded LRU of synthesized PCM, with an optional write-through disk tier"""
+
+    def __init__(self, max_bytes=TTS_CACHE_CONFIG["max_bytes"], disk_dir=TTS_CACHE_CONFIG["disk_dir"]):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self.bytes_held = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(text, voice, model, sample_rate, instructions=None, speed=None):
+        raw = "\x1f".join(str(part) for part in (normalize_segment(text), voice, model, sample_rate, instructions, speed))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pcm")
+
+    def get(self, key):
+        audio = self._entries.get(key)
+        if audio is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return audio
+        if self.disk_dir is not None and os.path.exists(self._disk_path(key)):
+            with open(self._disk_path(key), "rb") as f:
+                audio = f.read()
+            self.disk_hits += 1
+            self._store(key, audio)
+            return audio
+        self.misses += 1
+        return None
+
+    def put(self, key, audio):
+        self._store(key, audio)
+        if self.disk_dir is not None:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                tmp = self._disk_path(key) + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp, self._disk_path(key))
+            except OSError as e:
+                logger.warning("Could not persist TTS segment: %s", e)
+
+    def _store(self, key, audio):
+        if len(audio) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes_held -= len(previous)
+        self._entries[key] = audio
+        self.bytes_held += len(audio)
+        while self.bytes_held > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_held -= len(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes_held = 0
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "segments": len(self._entries),
+            "bytes_held": self.bytes_held,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+
+# Shared by every pipeline in the process
+tts_cache = TTSCache()
+
+
+class CachingTTSModel(TTSModel):
+    """Replay cached PCM for segments already synthesized; otherwise stream and remember"""
+
+    def __init__(self, inner, cache=tts_cache, sample_rate=TTS_CACHE_CONFIG["sample_rate"]):
+        self.inner = inner
+        self.cache = cache
+        self.sample_rate = sample_rate
+
+    @property
+    def model_name(self):
+        return self.inner.model_name
+
+    async def run(self, text, settings):
+        key = self.cache.key(text, settings.voice, self.inner.model_name, self.sample_rate,
+                             settings.instructions, settings.speed)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        async for chunk in self.inner.run(text, settings):
+            chunks.append(chunk)
+            yield chunk
+        # Only complete syntheses are cached; a cancelled stream never reaches here.
+        self.cache.put(key, b"".join(chunks))
+
+
+class CachingVoiceModelProvider(VoiceModelProvider):
+    """Wrap a voice provider so its TTS model goes through the shared cache"""
+
+    def __init__(self, inner, cache=tts_cache):
+        self.inner = inner
+        self.cache = cache
+
+    def get_stt_model(self, model_name):
+        return self.inner.get_stt_model(model_name)
+
+    def get_tts_model(self, model_name):
+        return CachingTTSModel(self.inner.get_tts_model(model_name), self.cache)
+
+
+async def warm_tts_cache(pipeline, phrases=TTS_CACHE_CONFIG["warmup_phrases"]):
+    """Synthesize `phrases` with a pipeline's TTS model and settings so they replay instantly"""
+    config = pipeline.config
+    model = config.model_provider.get_tts_model(None)
+    settings = config.tts_settings or TTSModelSettings()
+    for phrase in phrases:
+        try:
+            async for _ in model.run(phrase, settings):
+                pass
+        except Exception as e:
+            logger.warning("TTS warm-up failed for %r: %s", phrase, e)
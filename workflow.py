@@ -0,0 +1,214 @@
+"""
+Voice workflow and pipeline construction shared by the CLI and the Streamlit app
+"""
+
+import asyncio
+import inspect
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from agents import RunConfig, RunHooks, Runner
+from agents.voice import TTSModelSettings, VoicePipeline, VoicePipelineConfig, VoiceWorkflowBase, VoiceWorkflowHelper
+
+import metrics
+from config import RESPONSE_CACHE_CONFIG, ROUTING_CONFIG, SPECULATION_CONFIG, TTS_CACHE_CONFIG
+from connections import PooledModelProvider, PooledVoiceModelProvider
+from language_id import detect_language
+from response_cache import response_cache as shared_response_cache
+from speculation import weather_prefetcher
+from text_splitter import make_text_splitter
+from tts_cache import CachingVoiceModelProvider
+
+# Routing decisions since startup, e.g. {"direct:es": 3, "llm_fallback": 1}
+routing_stats = Counter()
+
+
+class MetricsRunHooks(RunHooks):
+    """Agent-run hooks that time tool calls and mark handoffs on the current turn"""
+
+    def __init__(self):
+        self._tool_starts = {}
+
+    async def on_handoff(self, context, from_agent, to_agent):
+        metrics.mark("handoff")
+
+    async def on_tool_start(self, context, agent, tool):
+        if metrics.current() is not metrics.NULL_TIMER:
+            self._tool_starts[(id(context), tool.name)] = time.monotonic()
+
+    async def on_tool_end(self, context, agent, tool, result):
+        start = self._tool_starts.pop((id(context), tool.name), None)
+        if start is not None:
+            metrics.current().add(f"tool:{tool.name}", time.monotonic() - start)
+
+
+_metrics_hooks = MetricsRunHooks()
+
+_current_record = ContextVar("turn_record", default=None)
+
+
+class TurnRecord:
+    """Text side of one voice turn (the SDK only streams audio back), filled in by the workflow.
+
+    With a `memory` (a memory.ConversationMemory) the turn is run with the
+    conversation so far and added to it once the reply is complete.
+    """
+
+    def __init__(self, memory=None):
+        self.memory = memory
+        self.transcript = None
+        self.reply = ""
+        self.agent = None
+        self.cached = False
+        self.usage = None
+        self.tts_chunks = 0
+
+
+def record_turn(memory=None):
+    """Start recording the next turn run from this context.
+
+    Call it before `pipeline.run()`: the SDK copies the context into the
+    tasks it creates there, and the workflow writes into the returned record.
+    """
+    record = TurnRecord(memory)
+    _current_record.set(record)
+    return record
+
+
+def current_record():
+    """The TurnRecord of the turn running in this context, or None"""
+    return _current_record.get()
+
+
+class AgentVoiceWorkflow(VoiceWorkflowBase):
+    """Run one agent (and whatever it hands off to) for each transcribed turn.
+
+    Unlike `SingleAgentVoiceWorkflow` this passes an explicit `RunConfig`, so
+    the LLM calls use the same pooled client as STT and TTS instead of the
+    SDK's global default client.
+
+    With `language_routes` ({"es": spanish_agent, ...}) each transcript is
+    first run through the local language check; a confident match starts the
+    turn on that agent directly, saving the LLM round trip and handoff call.
+    Low-confidence turns start on `agent` and rely on its handoffs as before.
+
+    With a `response_cache`, a repeated weather question is answered from the
+    previous reply while its weather data is still fresh, skipping the LLM
+    and tool calls entirely.
+
+    With a `prefetcher`, a weather question's lookup starts from the
+    transcript while the LLM is still deciding to call the tool.
+    """
+
+    def __init__(self, agent, run_config=None, language_routes=None,
+                 min_confidence=ROUTING_CONFIG["min_confidence"], response_cache=None, prefetcher=None):
+        self.agent = agent
+        self.run_config = run_config
+        self.language_routes = language_routes or {}
+        self.min_confidence = min_confidence
+        self.response_cache = response_cache
+        self.prefetcher = prefetcher
+
+    def select_agent(self, transcription, language_hint=None):
+        """Pick the agent that should answer this transcript"""
+        if not self.language_routes:
+            return self.agent
+        language, confidence = detect_language(transcription, language_hint)
+        target = self.language_routes.get(language)
+        if target is None or confidence < self.min_confidence:
+            routing_stats["llm_fallback"] += 1
+            return self.agent
+        routing_stats[f"direct:{language}"] += 1
+        return target
+
+    async def run(self, transcription):
+        metrics.mark("transcribed")
+        agent = self.select_agent(transcription)
+        record = _current_record.get() or TurnRecord()
+        record.transcript = transcription
+        record.reply = ""
+        record.agent = agent.name
+        record.cached = False
+        record.usage = None
+        record.tts_chunks = 0
+        cache_key = city = None
+        if self.response_cache is not None:
+            cache_key, city = self.response_cache.key_for(agent.name, transcription)
+            cached = self.response_cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                record.cached = True
+                for chunk in cached:
+                    record.reply += chunk
+                    metrics.mark("llm_first_token")
+                    yield chunk
+                metrics.mark("llm_done")
+                if record.memory is not None:
+                    record.memory.add_turn(transcription, record.reply)
+                return
+
+        if self.prefetcher is not None:
+            # The SDK only hands over final transcripts, so this is the earliest point to speculate.
+            self.prefetcher.speculate(transcription, agent)
+        hooks = _metrics_hooks if metrics.is_enabled() else None
+        run_input = transcription
+        if record.memory is not None:
+            run_input = record.memory.build_input(transcription, agent.name)
+        result = Runner.run_streamed(agent, run_input, run_config=self.run_config, hooks=hooks)
+        chunks = []
+        async for chunk in VoiceWorkflowHelper.stream_text_from(result):
+            metrics.mark("llm_first_token")
+            chunks.append(chunk)
+            record.reply += chunk
+            yield chunk
+        metrics.mark("llm_done")
+        record.agent = result.last_agent.name
+        record.usage = result.context_wrapper.usage
+        if record.memory is not None:
+            record.memory.add_turn(transcription, record.reply, record.usage)
+        if cache_key is not None:
+            self.response_cache.put(cache_key, chunks, city, result.new_items)
+
+
+# Cleanups scheduled by cancel_result, referenced until they finish so they aren't garbage-collected
+_cleanups = set()
+
+
+def cancel_result(result):
+    """Stop the STT/LLM/TTS tasks behind a StreamedAudioResult that is being abandoned.
+
+    Returns a task to await for the cleanup to finish, or None when it
+    already has (older SDK releases clean up synchronously).
+    """
+    # The SDK keeps these tasks private; cancelling our consumer alone leaves them running.
+    cleanup = getattr(result, "_cleanup_tasks", None)
+    if cleanup is None:
+        return None
+    pending = cleanup()
+    if not inspect.isawaitable(pending):
+        return None
+    task = asyncio.ensure_future(pending)
+    _cleanups.add(task)
+    task.add_done_callback(_cleanups.discard)
+    return task
+
+
+def build_pipeline(agent, api_key=None, language_routes=None):
+    """Create a VoicePipeline whose STT, LLM and TTS calls share pooled connections.
+
+    With TTS_CACHE_CONFIG["enabled"], synthesized segments are kept in the
+    process-wide TTS cache and repeated ones replay without an API call.
+    """
+    workflow = AgentVoiceWorkflow(
+        agent,
+        run_config=RunConfig(model_provider=PooledModelProvider(api_key)),
+        language_routes=language_routes,
+        response_cache=shared_response_cache if RESPONSE_CACHE_CONFIG["enabled"] else None,
+        prefetcher=weather_prefetcher if SPECULATION_CONFIG["enabled"] else None,
+    )
+    voice_provider = PooledVoiceModelProvider(api_key)
+    if TTS_CACHE_CONFIG["enabled"]:
+        voice_provider = CachingVoiceModelProvider(voice_provider)
+    tts_settings = TTSModelSettings(text_splitter=make_text_splitter(turn_state=current_record))
+    config = VoicePipelineConfig(model_provider=voice_provider, tts_settings=tts_settings)
+    return VoicePipeline(workflow=workflow, config=config)